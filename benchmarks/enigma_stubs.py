@@ -0,0 +1,152 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Enigma2 Stubs for Benchmarks                #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+
+The few enigma2 names the scraper modules import, so they load on a
+plain Linux box. Only for the benchmarks: nothing here draws or plays.
+Twisted is still needed, it is a regular Python package.
+"""
+__author__ = "Lululla"
+
+import sys
+import types
+from os.path import abspath, dirname, join
+from tempfile import gettempdir
+
+PLUGIN_DIR = join(dirname(dirname(abspath(__file__))), "usr", "lib",
+                  "enigma2", "python", "Plugins", "Extensions", "WorldCam")
+
+# Package name the plugin modules are loaded under
+PACKAGE = "WorldCam"
+
+
+class eTimer(object):
+    """
+    enigma.eTimer without a main loop: start() arms the timer and
+    fire() runs the callbacks, as the mainloop would on timeout.
+    """
+
+    def __init__(self):
+        self.callback = []
+        self.timeout = self
+        self.active = False
+        self.single_shot = False
+
+    def connect(self, func):
+        self.callback.append(func)
+        return self  # the connection object keeps the slot alive
+
+    def start(self, msec, single_shot=False):
+        self.active = True
+        self.single_shot = single_shot
+
+    def startLongTimer(self, seconds):
+        self.start(seconds * 1000, True)
+
+    def stop(self):
+        self.active = False
+
+    def isActive(self):
+        return self.active
+
+    def fire(self):
+        if self.single_shot:
+            self.active = False
+        for func in list(self.callback):
+            func()
+
+
+class eEnv(object):
+    @staticmethod
+    def resolve(path):
+        # ${sysconfdir}, $bindir...: everything goes to the temp dir
+        return gettempdir()
+
+
+class eDVBDB(object):
+    _instance = None
+
+    @classmethod
+    def getInstance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def reloadServicelist(self):
+        pass
+
+    def reloadBouquets(self):
+        pass
+
+
+class _Language(object):
+    def getLanguage(self):
+        return "en_GB"
+
+    def addCallback(self, func):
+        pass
+
+
+class AVSwitch(object):
+    def getFramebufferScale(self):
+        return (1, 1)
+
+
+def _module(name, **names):
+    module = sys.modules.get(name)
+    if module is None:
+        module = sys.modules[name] = types.ModuleType(name)
+        module.__path__ = []
+    for key, value in names.items():
+        setattr(module, key, value)
+    return module
+
+
+def install():
+    """Register the stub modules (keeps any real one already loaded)."""
+    if "enigma" not in sys.modules:
+        _module("enigma", eTimer=eTimer, eEnv=eEnv, eDVBDB=eDVBDB)
+    if "Tools.Directories" not in sys.modules:
+        _module("Tools")
+        _module("Tools.Directories", SCOPE_PLUGINS=0, SCOPE_CURRENT_SKIN=1,
+                resolveFilename=lambda scope, path="": join(
+                    gettempdir(), path))
+    if "Components.Language" not in sys.modules:
+        _module("Components")
+        _module("Components.Language", language=_Language())
+    if "Components.AVSwitch" not in sys.modules:
+        _module("Components")
+        _module("Components.AVSwitch", AVSwitch=AVSwitch)
+
+
+def load_plugin():
+    """
+    Register the plugin directory as package PACKAGE and return it.
+    Its __init__ is not run (it installs missing packages with opkg):
+    the package only carries what the modules import from it.
+    """
+    install()
+    package = sys.modules.get(PACKAGE)
+    if package is None:
+        package = _module(PACKAGE)
+        package.__path__ = [PLUGIN_DIR]
+        package.__file__ = join(PLUGIN_DIR, "__init__.py")
+        package.BASE_URL = "https://www.skylinewebcams.com"
+        package._ = lambda text: text
+    return package
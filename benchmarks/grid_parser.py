@@ -0,0 +1,177 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Grid Parser Benchmark                       #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+
+Times parsers.parse_grid against the former WEBCAM_PATTERN regex on
+regular and adversarial webcam pages of growing size. The scanner's
+cost per KB must stay flat; the regex runs in a child process and is
+stopped after LEGACY_TIMEOUT seconds.
+
+    python benchmarks/grid_parser.py [--max-kb 1024]
+"""
+__author__ = "Lululla"
+
+import argparse
+import importlib.util
+import multiprocessing
+import re
+import sys
+from os.path import abspath, dirname, join
+from time import perf_counter
+
+PLUGIN_DIR = join(dirname(dirname(abspath(__file__))), "usr", "lib",
+                  "enigma2", "python", "Plugins", "Extensions", "WorldCam")
+
+# Page sizes (KB), doubled up to --max-kb
+START_KB = 16
+
+# Longest a single legacy regex run may take (seconds)
+LEGACY_TIMEOUT = 10
+
+# Per-KB time may grow at most this much from the smallest to the
+# largest page before the run is reported as not linear
+MAX_GROWTH = 3.0
+
+LEGACY_PATTERN = re.compile(
+    r'<a\s+href="([^"]+)"\s+class="[^"]*col-xs-12[^"]*col-sm-6'
+    r'[^"]*col-md-4[^"]*"[^>]*>'
+    r'.*?<img\s+src="([^"]+)"[^>]*alt="([^"]*)"[^>]*>'
+    r'.*?<p\s+class="tcam">(.*?)</p>'
+    r'.*?<p\s+class="subt">(.*?)</p>', re.DOTALL)
+
+TILE = ('<a href="/en/webcam/italia/{i}.html" '
+        'class="col-xs-12 col-sm-6 col-md-4">'
+        '<img src="/thumbs/{i}.jpg" alt="Cam {i}">'
+        '<div class="cam-light"><p class="tcam">Cam {i}</p>'
+        '<p class="subt">Description {i}</p></div></a>\n')
+
+
+def load_parsers():
+    """parsers.py has no plugin dependencies: load it straight from disk."""
+    spec = importlib.util.spec_from_file_location(
+        "worldcam_parsers", join(PLUGIN_DIR, "parsers.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def fill(unit, size):
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def regular_page(size):
+    tiles = "".join(TILE.format(i=i) for i in range(50))
+    return fill(tiles + '<div class="ad">' + "x" * 2000 + "</div>", size)
+
+
+# Adversarial pages: each defeats one assumption of a backtracking regex
+PAGES = {
+    # Ordinary grid with ad blocks between the tiles
+    "regular": regular_page,
+    # Every tile lacks its description: each .*? group retries every
+    # later position before the match is given up
+    "missing_subt": lambda size: fill(
+        '<a href="/c" class="col-xs-12 col-sm-6 col-md-4">'
+        '<img src="/t.jpg" alt="t"><p class="tcam">Cam</p>', size),
+    # Tiles with hundreds of images and names but nothing after them
+    "img_flood": lambda size: fill(
+        '<a href="/c" class="col-xs-12 col-sm-6 col-md-4">' +
+        '<img src="/t.jpg" alt="t"><p class="tcam">x</p>' * 200, size),
+    # Opening tags whose ">" only comes at the very end of the page
+    "unclosed_tags": lambda size: fill(
+        '<a <img <a href="x" class="', size - 1) + ">",
+    # Huge class attributes that almost name the grid classes
+    "long_class": lambda size: fill(
+        '<a href="/c" class="' + "col-xs-12 col-sm-6 " * 400 + '">', size),
+}
+
+
+def time_call(func, html, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = perf_counter()
+        func(html)
+        elapsed = perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _legacy_child(html, queue):
+    started = perf_counter()
+    LEGACY_PATTERN.findall(html)
+    queue.put(perf_counter() - started)
+
+
+def time_legacy(html):
+    """Seconds taken by the old regex, or None if it hit LEGACY_TIMEOUT."""
+    queue = multiprocessing.Queue()
+    child = multiprocessing.Process(target=_legacy_child, args=(html, queue))
+    child.start()
+    child.join(LEGACY_TIMEOUT)
+    if child.is_alive():
+        child.terminate()
+        child.join()
+        return None
+    return queue.get()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--max-kb", type=int, default=1024)
+    parser.add_argument("--no-legacy", action="store_true",
+                        help="skip the old regex")
+    args = parser.parse_args(argv)
+    parsers = load_parsers()
+
+    print("%-14s %8s %12s %10s %14s" % (
+        "page", "size KB", "scanner ms", "us/KB", "legacy ms"))
+    failed = []
+    for name, make_page in PAGES.items():
+        per_kb = []
+        legacy_gave_up = args.no_legacy
+        kb = START_KB
+        while kb <= args.max_kb:
+            html = make_page(kb * 1024)
+            elapsed = time_call(parsers.parse_grid, html)
+            per_kb.append(elapsed * 1e6 / kb)
+            legacy = "-"
+            if not legacy_gave_up:
+                seconds = time_legacy(html)
+                if seconds is None:
+                    legacy = "> %ds" % LEGACY_TIMEOUT
+                    # Bigger pages only take longer
+                    legacy_gave_up = True
+                else:
+                    legacy = "%.1f" % (seconds * 1000)
+            print("%-14s %8d %12.2f %10.2f %14s" % (
+                name, kb, elapsed * 1000, per_kb[-1], legacy))
+            kb *= 2
+        growth = per_kb[-1] / max(per_kb[0], 1e-9)
+        if growth > MAX_GROWTH:
+            failed.append("%s (x%.1f per KB)" % (name, growth))
+
+    if failed:
+        print("Not linear: " + ", ".join(failed))
+        return 1
+    print("Scanner time per KB stayed within x%.1f on every page" % MAX_GROWTH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
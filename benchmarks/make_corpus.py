@@ -0,0 +1,301 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Benchmark Corpus Builder                    #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+
+Writes the skylinewebcams pages of benchmarks/corpus: homepages in
+several languages, a country, a location, top live cams and one webcam
+player page per kind of stream marker. The pages follow the markup of
+the site as the parsers read it (navigation mega menu, category tiles,
+webcam grid with ads, location buttons, player scripts) inside the
+usual head, scripts and footer. The output is deterministic, so the
+corpus only changes when this script does.
+
+    python benchmarks/make_corpus.py [--output benchmarks/corpus]
+"""
+__author__ = "Lululla"
+
+import argparse
+import random
+import sys
+from os import makedirs
+from os.path import abspath, dirname, join
+
+CORPUS_DIR = join(dirname(abspath(__file__)), "corpus")
+
+# Seed of every page, so rebuilding gives byte identical files
+SEED = 2025
+
+# Homepage languages written to the corpus
+LANGUAGES = ("en", "it", "de", "es")
+
+CONTINENTS = {
+    "en": ("Europe", "America", "Asia", "Africa", "Oceania"),
+    "it": ("Europa", "America", "Asia", "Africa", "Oceania"),
+    "de": ("Europa", "Amerika", "Asien", "Afrika", "Ozeanien"),
+    "es": ("Europa", "América", "Asia", "África", "Oceanía"),
+}
+CONTINENT_CLASSES = ("europa", "america", "asia", "africa", "oceania")
+
+# Country slugs per continent, as used in the page URLs
+COUNTRIES = (
+    ("italia", "espana", "ellada", "france", "deutschland", "hrvatska",
+     "portugal", "united-kingdom", "schweiz", "osterreich", "malta",
+     "slovenija", "norge", "ireland", "nederland", "polska", "cesko",
+     "magyarorszag", "bulgaria", "romania", "sverige", "island",
+     "san-marino", "montenegro", "cyprus"),
+    ("usa", "mexico", "brasil", "argentina", "canada", "costa-rica",
+     "peru", "chile", "republica-dominicana", "caribbean-netherlands",
+     "sint-maarten", "barbados", "ecuador", "belize", "honduras"),
+    ("thailand", "maldives", "china", "israel", "philippines",
+     "indonesia", "sri-lanka", "turkey", "japan", "vietnam"),
+    ("zanzibar", "kenya", "senegal", "egypt", "morocco", "seychelles",
+     "cabo-verde", "south-africa"),
+    ("australia", "new-zealand", "fiji", "french-polynesia"),
+)
+
+CATEGORIES = (
+    "beach-cams", "city-cams", "ski-cams", "unesco-cams", "port-cams",
+    "volcanoes-cams", "lake-cams", "animals-cams", "village-cams",
+    "nature-mountain-cams", "sea-cams", "live-cams-for-kids",
+)
+
+WORDS = (
+    "view", "harbour", "square", "beach", "old", "town", "panorama",
+    "cathedral", "lake", "mountain", "bay", "lighthouse", "promenade",
+    "castle", "island", "coast", "bridge", "valley", "marina", "church",
+)
+
+
+def title(slug):
+    return slug.replace("-", " ").title()
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def head(rng, lang, page_title):
+    """<head> with the metadata, styles and JSON-LD of a real page."""
+    metas = "".join(
+        '<link rel="alternate" hreflang="%s" '
+        'href="https://www.skylinewebcams.com/%s.html">\n' % (code, code)
+        for code in ("en", "it", "de", "es", "fr", "pl", "el", "hr", "sl",
+                     "ru", "zh"))
+    json_ld = ",".join(
+        '{"@type":"ListItem","position":%d,"name":"%s"}'
+        % (i, sentence(rng, 3)) for i in range(60))
+    return (
+        '<!DOCTYPE html>\n<html lang="%s">\n<head>\n'
+        '<meta charset="utf-8">\n'
+        '<meta name="viewport" content="width=device-width,'
+        'initial-scale=1">\n'
+        '<title>%s | SkylineWebcams</title>\n'
+        '<meta name="description" content="%s">\n%s'
+        '<link rel="stylesheet" href="https://cdn.skylinewebcams.com/'
+        'css/skyline.css?v=%d">\n'
+        '<style>.cam-light{position:relative}.tcam{font-weight:700}'
+        '.subt{font-size:.9em}</style>\n'
+        '<script type="application/ld+json">{"@context":'
+        '"https://schema.org","@type":"ItemList","itemListElement":[%s]}'
+        '</script>\n</head>\n' % (
+            lang, page_title, sentence(rng, 25), metas,
+            rng.randrange(100000), json_ld))
+
+
+def navigation(rng, lang):
+    """Navigation bar with the continents mega menu on every page."""
+    parts = ['<body>\n<nav class="navbar navbar-inverse">\n'
+             '<div class="container-fluid">\n'
+             '<a class="navbar-brand" href="/%s.html">'
+             'SkylineWebcams</a>\n'
+             '<ul class="nav navbar-nav"><li class="dropdown '
+             'mega-dropdown">\n<div class="dropdown-menu '
+             'mega-dropdown-menu">\n' % lang]
+    for i, countries in enumerate(COUNTRIES):
+        parts.append(
+            '<div class="col-sm-3">\n<div class="continent %s"><strong>%s'
+            '</strong></div>\n<div class="list">\n' % (
+                CONTINENT_CLASSES[i], CONTINENTS[lang][i]))
+        for slug in countries:
+            parts.append('<a href="/%s/webcam/%s.html">%s</a>\n'
+                         % (lang, slug, title(slug)))
+        parts.append('</div>\n</div>\n')
+    parts.append('</div></li></ul>\n<form class="navbar-form" '
+                 'action="/%s/search.html"><input type="text" name="q" '
+                 'placeholder="Search"></form>\n</div>\n</nav>\n' % lang)
+    return "".join(parts)
+
+
+def tile(rng, lang, path, number):
+    """One webcam tile of the grid."""
+    name = "%s - %s" % (title(path.split("/")[-1]), sentence(rng, 2))
+    return (
+        '<a href="/%s/webcam/%s/%s-%d.html" class="col-xs-12 col-sm-6 '
+        'col-md-4">\n<div class="cam-light">\n'
+        '<img src="https://cdn.skylinewebcams.com/live%d.jpg" '
+        'loading="lazy" alt="%s" width="500" height="281">\n'
+        '<span class="lcam">LIVE</span>\n'
+        '<p class="tcam">%s</p>\n<p class="subt">%s</p>\n'
+        '</div>\n</a>\n' % (
+            lang, path, rng.choice(WORDS), number, rng.randrange(10000),
+            name, name, sentence(rng, 10)))
+
+
+def ad_tile(rng, lang):
+    """Advertisement blocks mixed into the grid."""
+    if rng.random() < 0.5:
+        return (
+            '<a href="/%s/promo.html" class="col-xs-12 col-sm-6 col-md-4">'
+            '\n<div class="cam-light">\n<img src="/img/ad.png" alt="ad">\n'
+            '<p class="tcam">Advertisement</p>\n<p class="subt"></p>\n'
+            '</div>\n</a>\n' % lang)
+    return ('<div class="col-xs-12 col-sm-6 col-md-4 ad">'
+            '<ins class="adsbygoogle" data-ad-slot="%d"></ins>'
+            '<script>(adsbygoogle=window.adsbygoogle||[]).push({});'
+            '</script></div>\n' % rng.randrange(10 ** 9))
+
+
+def grid(rng, lang, path, count):
+    parts = ['<div class="container">\n<div class="row list">\n']
+    for number in range(count):
+        if number and number % 8 == 0:
+            parts.append(ad_tile(rng, lang))
+        parts.append(tile(rng, lang, path, number))
+    parts.append('</div>\n</div>\n')
+    return "".join(parts)
+
+
+def footer(rng, lang):
+    links = "".join('<li><a href="/%s/%s.html">%s</a></li>\n'
+                    % (lang, slug, title(slug)) for slug in CATEGORIES)
+    script = "".join(
+        'window.sky.t%d=function(e){return e&&e.target?%d:0};\n' % (i, i)
+        for i in range(150))
+    return (
+        '<footer class="footer">\n<ul class="list-inline">\n%s</ul>\n'
+        '<p>%s</p>\n</footer>\n'
+        '<script src="https://cdn.skylinewebcams.com/js/jquery.min.js">'
+        '</script>\n<script>window.sky={};\n%s</script>\n'
+        '</body>\n</html>\n' % (links, sentence(rng, 40), script))
+
+
+def homepage(rng, lang):
+    parts = [head(rng, lang, "Live webcams"), navigation(rng, lang),
+             '<div class="container">\n<h1>%s</h1>\n<div class="row">\n'
+             % sentence(rng, 5)]
+    for slug in CATEGORIES:
+        parts.append(
+            '<a href="/%s/%s.html" class="col-xs-6 col-sm-4 col-md-2">\n'
+            '<p class="tcam">%s</p>\n<img src="/img/%s.jpg" alt="%s">\n'
+            '</a>\n' % (lang, slug, title(slug), slug, title(slug)))
+    parts.append('</div>\n</div>\n')
+    parts.append(grid(rng, lang, "italia/veneto/venezia", 40))
+    parts.append(footer(rng, lang))
+    return "".join(parts)
+
+
+def country_page(rng, lang):
+    regions = ("abruzzo", "basilicata", "calabria", "campania",
+               "emilia-romagna", "friuli-venezia-giulia", "lazio",
+               "liguria", "lombardia", "marche", "molise", "piemonte",
+               "puglia", "sardegna", "sicilia", "toscana",
+               "trentino-alto-adige", "umbria", "valle-d-aosta", "veneto")
+    parts = [head(rng, lang, "Italy"), navigation(rng, lang),
+             '<div class="container">\n<h1>Italy</h1>\n<div class="row">\n']
+    for slug in regions:
+        parts.append(
+            '<a href="/%s/webcam/italia/%s.html" class="btn btn-primary '
+            'tag">%s</a>\n' % (lang, slug, title(slug)))
+    parts.append('</div>\n</div>\n')
+    parts.append(grid(rng, lang, "italia/lazio/roma", 30))
+    parts.append(footer(rng, lang))
+    return "".join(parts)
+
+
+def location_page(rng, lang):
+    """A region: no location buttons, only the grid."""
+    return (head(rng, lang, "Lazio") + navigation(rng, lang) +
+            '<div class="container"><h1>Lazio</h1></div>\n' +
+            grid(rng, lang, "italia/lazio/roma", 36) + footer(rng, lang))
+
+
+def top_page(rng, lang):
+    pages = "".join('<li><a href="/%s/top-webcams-%d.html">%d</a></li>'
+                    % (lang, number, number) for number in range(1, 6))
+    return (head(rng, lang, "Top live cams") + navigation(rng, lang) +
+            grid(rng, lang, "italia/campania/napoli", 60) +
+            '<ul class="pagination">%s</ul>\n' % pages + footer(rng, lang))
+
+
+# Player script of each kind of webcam page (see parsers.STREAM_MARKERS)
+PLAYERS = {
+    "hls": "var player=new Clappr.Player({source:'livee.m3u8?a=%s',"
+           "parentId:'#live',autoPlay:true});",
+    "youtube": "var player=new YT.Player('live',{height:'100%%',"
+               "videoId:'%s',playerVars:{autoplay:1}});",
+    "jwplayer": 'var player=jwplayer("live");player.setup({\n'
+                '  image: "/img/poster.jpg",\n  autostart: true,\n'
+                '  file: "https://hd-auth.skylinewebcams.com/%s.m3u8"\n});',
+    "video": "",
+}
+
+
+def webcam_page(rng, lang, kind):
+    token = "".join(rng.choice("abcdef0123456789") for _ in range(20))
+    video = ('<video id="live" src="/video/%s.mp4" controls></video>'
+             % token if kind == "video" else '<div id="live"></div>')
+    player = PLAYERS[kind] % token if "%s" in PLAYERS[kind] else ""
+    return (
+        head(rng, lang, "Rome - Trevi Fountain") + navigation(rng, lang) +
+        '<div class="container">\n<h1>Rome - Trevi Fountain</h1>\n'
+        '<div class="player">%s</div>\n<div class="cam-description">\n'
+        '%s\n</div>\n</div>\n' % (video, "".join(
+            "<p>%s</p>\n" % sentence(rng, 30) for _ in range(12))) +
+        '<script>%s</script>\n' % player +
+        '<h2>Nearby webcams</h2>\n' +
+        grid(rng, lang, "italia/lazio/roma", 12) + footer(rng, lang))
+
+
+def pages():
+    """Yield (file name, html) of every corpus page."""
+    rng = random.Random(SEED)
+    for lang in LANGUAGES:
+        yield "homepage-%s.html" % lang, homepage(rng, lang)
+    yield "country-italia.html", country_page(rng, "en")
+    yield "location-lazio.html", location_page(rng, "en")
+    yield "top-live-cams.html", top_page(rng, "en")
+    for kind in PLAYERS:
+        yield "webcam-%s.html" % kind, webcam_page(rng, "en", kind)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--output", default=CORPUS_DIR)
+    args = parser.parse_args(argv)
+    makedirs(args.output, exist_ok=True)
+    for name, html in pages():
+        with open(join(args.output, name), "w", encoding="utf-8",
+                  newline="\n") as f:
+            f.write(html)
+        print("%-24s %7d bytes" % (name, len(html.encode("utf-8"))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Parser Benchmark                            #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+
+Runs the scraper parsers and parseDOM over the saved pages of
+benchmarks/corpus, offline and without enigma2 (see enigma_stubs), and
+reports ops/sec and peak memory for each parser and page. Save a run
+with --save on one revision and check another against it with
+--compare: slower parsers, more memory or a different output fail the
+run. Timings only compare between runs on the same, otherwise idle,
+machine and Python version.
+
+Only the public entry points are timed, so the script runs on older
+revisions too: get_continents and get_stream_url download through a
+scraper whose fetch (and scan_page session, where there is one) serves
+the corpus page. See README.md for what the corpus is.
+
+    python benchmarks/parse_corpus.py [--save base.json]
+    python benchmarks/parse_corpus.py --compare base.json
+"""
+__author__ = "Lululla"
+
+import argparse
+import gc
+import importlib
+import json
+import platform
+import sys
+import tracemalloc
+from hashlib import sha1
+from os.path import abspath, dirname, join
+from time import perf_counter
+
+import enigma_stubs
+
+CORPUS_DIR = join(dirname(abspath(__file__)), "corpus")
+
+# Minimum length of one timing round (seconds), best round counts
+MIN_ROUND_TIME = 0.2
+ROUNDS = 7
+
+# Relative change from the baseline that fails --compare
+TOLERANCE = 0.25
+
+HOMEPAGES = ("homepage-en", "homepage-it", "homepage-de", "homepage-es")
+GRID_PAGES = ("country-italia", "location-lazio", "top-live-cams",
+              "homepage-en")
+WEBCAM_PAGES = ("webcam-hls", "webcam-youtube", "webcam-jwplayer",
+                "webcam-video")
+DOM_PAGES = ("country-italia", "webcam-hls")
+
+
+class _CorpusSession(object):
+    """network.get_session() of the benchmarks: serves corpus pages."""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def request(self, url, **kwargs):
+        return _CorpusResponse(self.pages[url])
+
+
+class _CorpusResponse(object):
+    """A 200 response streaming data, as scraper.scan_page reads it."""
+
+    status = 200
+    reason = "OK"
+
+    def __init__(self, data):
+        self.data = data
+        self.wire_bytes = 0
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.data), chunk_size):
+            chunk = self.data[start:start + chunk_size]
+            self.wire_bytes += len(chunk)
+            yield chunk
+
+    def close(self, drain=True):
+        pass
+
+
+def load_modules():
+    enigma_stubs.load_plugin()
+    modules = dict(
+        (name, importlib.import_module(enigma_stubs.PACKAGE + "." + name))
+        for name in ("scraper", "dom_parser", "client", "utils"))
+    # Logging is console and file I/O, not parsing
+    modules["utils"].Logger.log = lambda self, *args, **kwargs: None
+    return modules
+
+
+def benchmarks(modules):
+    """
+    (name, pages, make) of each benchmark: make(page, html) returns the
+    function to time, called without arguments.
+    """
+    scraper = modules["scraper"]
+    Scraper = scraper.SkylineScraper
+    dom_parser = modules["dom_parser"]
+    client = modules["client"]
+    # Webcam pages by URL, for get_stream_url
+    served = {}
+    if hasattr(scraper, "get_session"):
+        # scan_page streams the page through the pooled session
+        scraper.get_session = lambda: _CorpusSession(served)
+
+    def offline(lang, html):
+        """A scraper whose fetch returns html instead of downloading."""
+        instance = Scraper(lang)
+        instance.fetch = lambda *args, **kwargs: html
+        return instance
+
+    def webcams(page, html):
+        return lambda: Scraper.parse_webcams(html)
+
+    def locations(page, html):
+        return lambda: Scraper.parse_locations(html)
+
+    def continents(page, html):
+        # homepage-<lang>: the page is parsed in its own language
+        instance = offline(page.rsplit("-", 1)[1], html)
+
+        def run():
+            # Parse every time, not once into the parsed cache
+            instance.clear_cache()
+            return instance.get_continents()
+        return run
+
+    def stream_url(page, html):
+        url = "%s/en/webcam/corpus/%s.html" % (Scraper.BASE_URL, page)
+        served[url] = html.encode("utf-8")
+        instance = offline("en", html)
+        return lambda: instance.get_stream_url(url)
+
+    def dom_queries(page, html):
+        # Newer dom_parser indexes the tags of the last documents: clear
+        # it so every run parses a new document, as a page load does
+        indexes = getattr(dom_parser, "_indexes", None)
+
+        def run():
+            if indexes is not None:
+                indexes.clear()
+            return (
+                dom_parser.parse_dom(html, "a", {"class": "btn"}) +
+                dom_parser.parse_dom(html, "div", {"class": "cam-light"}) +
+                dom_parser.parse_dom(html, "p", {"class": "tcam"}))
+        return run
+
+    def client_queries(page, html):
+        return lambda: (
+            client.parseDOM(html, "a", attrs={"class": "btn btn-primary tag"})
+            + client.parseDOM(html, "p", attrs={"class": "tcam"}) +
+            client.parseDOM(html, "a", ret="href"))
+
+    return [
+        ("parse_webcams", GRID_PAGES, webcams),
+        ("parse_locations", GRID_PAGES[:2], locations),
+        ("get_continents", HOMEPAGES, continents),
+        ("get_stream_url", WEBCAM_PAGES, stream_url),
+        ("dom_parser.parse_dom", DOM_PAGES, dom_queries),
+        ("client.parseDOM", DOM_PAGES, client_queries),
+    ]
+
+
+def read_page(page):
+    with open(join(CORPUS_DIR, page + ".html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def time_ops(func, min_time, rounds):
+    """Calls per second of func, best of rounds of at least min_time."""
+    number = 1
+    while True:
+        elapsed = _time_round(func, number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed) + 1)
+    best = elapsed
+    for _ in range(rounds - 1):
+        best = min(best, _time_round(func, number))
+    return number / best
+
+
+def _time_round(func, number):
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = perf_counter()
+        for _ in range(number):
+            func()
+        return perf_counter() - started
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def peak_memory(func):
+    """Peak bytes allocated by one call (Python allocations only)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def describe(value):
+    """(items, digest) of a parser result, to notice changed output."""
+    items = len(value) if isinstance(value, (list, tuple)) else int(
+        bool(value))
+    return items, sha1(repr(value).encode("utf-8")).hexdigest()[:12]
+
+
+def run(args):
+    modules = load_modules()
+    results = {}
+    for name, pages, make in benchmarks(modules):
+        if args.filter and args.filter not in name:
+            continue
+        for page in pages:
+            func = make(page, read_page(page))
+            items, digest = describe(func())
+            results[name + "/" + page] = {
+                "ops": time_ops(func, args.min_time, args.rounds),
+                "peak_kb": peak_memory(func) / 1024.0,
+                "items": items,
+                "digest": digest,
+            }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print results against baseline, return the regressions."""
+    failed = []
+    print("%-44s %11s %9s %6s %9s %8s" % (
+        "benchmark/page", "ops/sec", "peak KB", "items", "ops", "memory"))
+    for key, result in results.items():
+        base = baseline.get(key)
+        speed = memory = ""
+        if base:
+            ratio = result["ops"] / base["ops"]
+            growth = result["peak_kb"] / max(base["peak_kb"], 1e-9)
+            speed = "x%.2f" % ratio
+            memory = "x%.2f" % growth
+            if ratio < 1 - tolerance:
+                failed.append("%s is slower (%s)" % (key, speed))
+            if growth > 1 + tolerance:
+                failed.append("%s uses more memory (%s)" % (key, memory))
+            if result["digest"] != base["digest"]:
+                failed.append("%s output changed (%d items, was %d)" % (
+                    key, result["items"], base["items"]))
+        print("%-44s %11.1f %9.1f %6d %9s %8s" % (
+            key, result["ops"], result["peak_kb"], result["items"],
+            speed, memory))
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--save", metavar="FILE",
+                        help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="fail on regressions against a saved run")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--filter", metavar="TEXT",
+                        help="only benchmarks whose name contains TEXT")
+    parser.add_argument("--min-time", type=float, default=MIN_ROUND_TIME)
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        if saved.get("python") != platform.python_version():
+            print("Baseline ran on Python %s, this is %s" % (
+                saved.get("python"), platform.python_version()))
+        baseline = saved["results"]
+
+    results = run(args)
+    failed = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "machine": platform.machine(),
+                       "results": results}, f, indent=1, sort_keys=True)
+    if failed:
+        print("Regressions:\n  " + "\n  ".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from threading import Lock
+from time import time
+from urllib.parse import urlsplit
+
+from twisted.internet import reactor
+
+from .ratelimit import HostHeldError
+from .resolver import CachedHTTPConnection, CachedHTTPSConnection
+from .utils import Logger
+from .workers import call_in_main, run_async
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Circuit Breaker for Plugin                  #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+# Consecutive failures that open the circuit of a host
+BREAKER_FAILURES = 3
+
+# First open period, doubled after every failed probe (seconds)
+BREAKER_COOLDOWN = 30
+BREAKER_MAX_COOLDOWN = 600
+
+# Timeout of the background probe of an open host (seconds)
+PROBE_TIMEOUT = 5
+
+# Responses that count as the host being down
+FAILURE_STATUSES = (502, 503, 504)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(OSError):
+    """Raised instead of contacting a host whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    State of one host. Closed: requests go through. Open: requests
+    fail at once; after the cooldown a single probe runs in the
+    background (half-open) and closes the circuit if the host answers.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = BREAKER_COOLDOWN
+        self.opened_at = 0
+        self.probe_url = None
+        self.trips = 0
+        self.rejected = 0
+        self._lock = Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            # The probe never ran (e.g. no reactor): let one request try
+            if (self.state == OPEN
+                    and time() > self.opened_at + self.cooldown
+                    + 2 * PROBE_TIMEOUT):
+                self.state = HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                Logger().info("Circuit closed for " + self.host)
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = BREAKER_COOLDOWN
+
+    def failure(self, url):
+        with self._lock:
+            self.failures += 1
+            self.probe_url = url
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, BREAKER_MAX_COOLDOWN)
+            elif self.state == OPEN or self.failures < BREAKER_FAILURES:
+                return
+            self.state = OPEN
+            self.opened_at = time()
+            self.trips += 1
+            cooldown = self.cooldown
+        Logger().warning(
+            "Circuit open for %s, probing in %ds" % (self.host, cooldown))
+        call_in_main(reactor.callLater, cooldown, self._start_probe)
+
+    def _start_probe(self):
+        with self._lock:
+            if self.state != OPEN:
+                return
+            self.state = HALF_OPEN
+        run_async(self._probe).addErrback(lambda failure: None)
+
+    def _probe(self):
+        """
+        Worker thread: is the host answering again? The probe goes
+        through the same DNS cache and TLS settings as the requests.
+        """
+        # network imports this module (guard)
+        from .network import get_ssl_context
+        parts = urlsplit(self.probe_url)
+        try:
+            if parts.scheme == "https":
+                conn = CachedHTTPSConnection(
+                    parts.hostname, parts.port, timeout=PROBE_TIMEOUT,
+                    context=get_ssl_context(False))
+            else:
+                conn = CachedHTTPConnection(
+                    parts.hostname, parts.port, timeout=PROBE_TIMEOUT)
+            try:
+                conn.request("HEAD", parts.path or "/")
+                status = conn.getresponse().status
+            finally:
+                conn.close()
+        except (OSError, ValueError) as e:
+            Logger().info("Probe of %s failed: %s" % (self.host, e))
+            self.failure(self.probe_url)
+            return
+        if status in FAILURE_STATUSES:
+            self.failure(self.probe_url)
+        else:
+            self.success()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+
+_breakers = {}
+_breakers_lock = Lock()
+
+
+def get_breaker(url):
+    """Return the CircuitBreaker of the host of url."""
+    host = urlsplit(url).hostname or ""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+def is_open(url):
+    return get_breaker(url).state != CLOSED
+
+
+def guard(url, send):
+    """
+    Call send() unless the host's circuit is open (CircuitOpenError)
+    and record the outcome. send() returns a response with getcode().
+    A host holding us off (HostHeldError) is not a failure: it answered.
+    """
+    breaker = get_breaker(url)
+    if not breaker.allow():
+        raise CircuitOpenError("Host unreachable, circuit open: " +
+                               breaker.host)
+    try:
+        response = send()
+    except HostHeldError:
+        raise
+    except OSError:
+        breaker.failure(url)
+        raise
+    if response.getcode() in FAILURE_STATUSES:
+        breaker.failure(url)
+    else:
+        breaker.success()
+    return response
+
+
+def get_stats():
+    with _breakers_lock:
+        breakers = list(_breakers.items())
+    return dict((host, breaker.stats()) for host, breaker in breakers)
@@ -0,0 +1,386 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from copy import deepcopy
+from hashlib import sha1
+from json import dump, load
+from os import listdir, makedirs, remove, rename, utime
+from os.path import exists, getmtime, getsize, join
+from sys import getsizeof
+from threading import RLock
+from time import time
+
+from enigma import eEnv
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Cache for Plugin                            #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+# Memory budget for the shared page cache (bytes)
+PAGE_CACHE_MAX_BYTES = 6 * 1024 * 1024
+
+# Default lifetime of a cached page (seconds)
+PAGE_CACHE_TTL = 3600
+
+# Memory budget for parsed pages (bytes): records are a small fraction
+# of the HTML they come from
+PARSED_CACHE_MAX_BYTES = 2 * 1024 * 1024
+
+# HTTP cache files, revalidated with ETag/Last-Modified once an entry
+# is older than its TTL. Kept next to the catalog snapshots so a reboot
+# starts warm (/tmp is tmpfs on Enigma2 images). This is flash storage:
+# files are written when a page changes, a 304 only updates the mtime.
+# Pass another directory to DiskCache to move it (e.g. to /media/hdd)
+DISK_CACHE_DIR = join(eEnv.resolve("${sysconfdir}/enigma2"), "worldcam",
+                      "http_cache")
+DISK_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+
+def cache_key(url, lang):
+    """
+    Key of a page in both caches, tagged with the language it was
+    requested in (sent as Accept-Language).
+    """
+    return lang + "|" + url
+
+
+def parsed_key(url, lang, parser, version):
+    """
+    Key of a parse result: the page, the language and the parser that
+    produced it, so results of an older parser version are never used.
+    """
+    return "%s|%s:%d" % (cache_key(url, lang), parser, version)
+
+
+def deep_size(value):
+    """Approximate memory used by value and the containers/strings in it."""
+    size = getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k) + deep_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_size(item) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += deep_size(vars(value))
+    return size
+
+
+class PageCache:
+    """
+    Thread-safe LRU cache with a byte budget and per-entry TTLs.
+
+    Entries are evicted least-recently-used first once the budget is
+    exceeded; expired entries are kept (as stale copies) until the
+    budget needs their room.
+    """
+
+    def __init__(self, max_bytes=PAGE_CACHE_MAX_BYTES,
+                 default_ttl=PAGE_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (value, size, expires)
+        self._lock = RLock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing/expired."""
+        value, fresh = self.peek(key)
+        return value if fresh else default
+
+    def peek(self, key):
+        """
+        Return (value, fresh) for key without dropping expired entries,
+        so a stale copy can still be served while it is refreshed.
+        (None, False) if the key is not cached at all.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            value, size, expires = entry
+            self._entries.move_to_end(key)
+            if expires and expires < time():
+                self.misses += 1
+                return value, False
+
+            self.hits += 1
+            return value, True
+
+    def set(self, key, value, ttl=None, size=None):
+        """
+        Store value under key for ttl seconds (default_ttl if None,
+        never expires if 0). Values larger than the whole budget are
+        not cached.
+        """
+        if size is None:
+            size = getsizeof(value)
+        if size > self.max_bytes:
+            return False
+
+        if ttl is None:
+            ttl = self.default_ttl
+        expires = time() + ttl if ttl else 0
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+            self._shrink()
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def purge_expired(self):
+        """Drop every expired entry, return how many were removed."""
+        now = time()
+        with self._lock:
+            expired = [key for key, (value, size, expires)
+                       in self._entries.items() if expires and expires < now]
+            for key in expired:
+                self._remove(key)
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key):
+        value, size, expires = self._entries.pop(key)
+        self._bytes -= size
+
+    def _shrink(self):
+        if self._bytes <= self.max_bytes:
+            return
+        self.purge_expired()
+        while self._bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+
+class ParsedCache(PageCache):
+    """
+    PageCache for parse results. A list of records sharing the same
+    keys is stored as one tuple of keys plus a tuple of values per
+    record, and turned back into fresh dicts when read. Other values
+    (e.g. a HomepageModel) are copied on read, so callers never share
+    (or alter) the cached copy.
+    """
+
+    def __init__(self, max_bytes=PARSED_CACHE_MAX_BYTES,
+                 default_ttl=PAGE_CACHE_TTL):
+        PageCache.__init__(self, max_bytes, default_ttl)
+
+    def peek(self, key):
+        value, fresh = PageCache.peek(self, key)
+        if isinstance(value, _Records):
+            value = value.unpack()
+        elif value is not None:
+            value = deepcopy(value)
+        return value, fresh
+
+    def set(self, key, value, ttl=None, size=None):
+        value = _Records.pack(value)
+        if size is None:
+            size = deep_size(value)
+        return PageCache.set(self, key, value, ttl, size)
+
+
+# Record values that can be shared between copies as they are
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+
+class _Records(object):
+    __slots__ = ("fields", "rows", "flat")
+
+    def __init__(self, fields, rows):
+        self.fields = fields
+        self.rows = rows
+        # Nested lists/dicts (e.g. a continent's countries) are copied
+        self.flat = all(isinstance(item, _IMMUTABLE)
+                        for row in rows for item in row)
+
+    @classmethod
+    def pack(cls, value):
+        """A _Records for a list of same-shaped dicts, else value."""
+        if not isinstance(value, list) or not value:
+            return value
+        if not all(isinstance(item, dict) for item in value):
+            return value
+        fields = tuple(value[0])
+        if any(tuple(item) != fields for item in value):
+            return value
+        return cls(fields, tuple(tuple(item.values()) for item in value))
+
+    def unpack(self):
+        records = [dict(zip(self.fields, row)) for row in self.rows]
+        return records if self.flat else deepcopy(records)
+
+    def __sizeof__(self):
+        return (object.__sizeof__(self) + getsizeof(self.fields)
+                + deep_size(self.rows))
+
+
+class DiskCache:
+    """
+    Persistent HTTP response cache storing body and validators.
+
+    One JSON file per URL; its mtime is the time the entry was stored
+    or last validated. When the directory grows past max_bytes the
+    least recently stored/validated files are removed first.
+    """
+
+    def __init__(self, directory=DISK_CACHE_DIR,
+                 max_bytes=DISK_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = RLock()
+        self._bytes = None  # computed lazily on first write
+
+    def _path(self, url):
+        return join(self.directory,
+                    sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url):
+        """
+        Return a dict with body, etag, last_modified and stored time,
+        or None if the URL is not cached.
+        """
+        path = self._path(url)
+        if not exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = load(f)
+            if entry.get("url") != url:
+                return None
+            entry["stored"] = getmtime(path)
+            return entry
+        except Exception:
+            self._discard(path)
+            return None
+
+    def set(self, url, body, etag=None, last_modified=None):
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+        }
+        path = self._path(url)
+        tmp_path = path + ".tmp"
+        with self._lock:
+            try:
+                if not exists(self.directory):
+                    makedirs(self.directory)
+                self.size()
+                old_size = getsize(path) if exists(path) else 0
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    dump(entry, f, ensure_ascii=False)
+                rename(tmp_path, path)
+                self._account(getsize(path) - old_size)
+                return True
+            except Exception:
+                self._discard(tmp_path)
+                return False
+
+    def touch(self, url):
+        """
+        Mark an entry as freshly validated (after a 304): only its
+        mtime changes, the body is not written again.
+        """
+        try:
+            utime(self._path(url), None)
+            return True
+        except Exception:
+            return False
+
+    def clear(self):
+        with self._lock:
+            for name in self._files():
+                self._discard(join(self.directory, name))
+            self._bytes = 0
+
+    def size(self):
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(
+                    getsize(join(self.directory, name))
+                    for name in self._files())
+            return self._bytes
+
+    def _files(self):
+        if not exists(self.directory):
+            return []
+        return [name for name in listdir(self.directory)
+                if name.endswith(".json")]
+
+    def _account(self, delta):
+        self._bytes += delta
+        if self._bytes <= self.max_bytes:
+            return
+        paths = sorted(
+            (join(self.directory, name) for name in self._files()),
+            key=getmtime)
+        for path in paths:
+            if self._bytes <= self.max_bytes:
+                break
+            size = getsize(path)
+            if self._discard(path):
+                self._bytes -= size
+
+    @staticmethod
+    def _discard(path):
+        try:
+            remove(path)
+            return True
+        except Exception:
+            return False
+
+
+# Process-wide caches shared by every SkylineScraper instance
+page_cache = PageCache()
+parsed_cache = ParsedCache()
+disk_cache = DiskCache()
@@ -0,0 +1,459 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import gzip
+from collections import deque
+from json import dump, load
+from os import makedirs, rename
+from os.path import exists, join
+from threading import RLock
+from time import time
+
+from enigma import eEnv
+from twisted.internet import reactor
+from twisted.internet.threads import deferToThreadPool
+
+from .scraper import BASE_URL, SkylineScraper
+from .utils import Logger
+from .workers import SingleFlight, get_pool, run_async
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Catalog Crawler for Plugin                  #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+# One catalog snapshot per language, kept across reboots. This is
+# flash storage: it is only rewritten every CRAWL_CHECKPOINT_INTERVAL
+# and when a crawl stops or finishes
+CATALOG_DIR = join(eEnv.resolve("${sysconfdir}/enigma2"), "worldcam")
+
+# Bump when the snapshot layout changes: older files are then ignored
+SNAPSHOT_VERSION = 1
+
+# Crawler worker threads (separate from the screens' pool)
+CRAWL_WORKERS = 2
+
+# The crawler only runs after this many seconds without user activity
+CRAWL_IDLE_AFTER = 120
+
+# How often a paused crawler checks again for idleness (seconds)
+CRAWL_IDLE_POLL = 30
+
+# A refresh pass starts this many seconds after the previous one ended
+CRAWL_INTERVAL = 6 * 3600
+
+# A refresh pass only re-crawls pages older than this (seconds)
+CATALOG_MAX_AGE = 24 * 3600
+
+# While a pass runs, progress is written to disk at most this often
+# (seconds)
+CRAWL_CHECKPOINT_INTERVAL = 15 * 60
+
+_last_activity = 0
+_busy = 0
+
+
+def note_activity():
+    """Called by the screens on every foreground load."""
+    global _last_activity
+    _last_activity = time()
+
+
+def set_busy(busy):
+    """Pause the crawler while something heavy (e.g. playback) runs."""
+    global _busy
+    _busy = max(0, _busy + (1 if busy else -1))
+    note_activity()
+
+
+def is_idle():
+    return not _busy and time() - _last_activity >= CRAWL_IDLE_AFTER
+
+
+class Catalog:
+    """
+    Local copy of the skylinewebcams tree for one language:
+    continents (with their countries), countries, categories, and
+    locations / webcams keyed by the URL of the page listing them.
+
+    Saved as a gzipped JSON snapshot of the parsed data, stamped with
+    SNAPSHOT_VERSION, language and crawl time.
+    """
+
+    def __init__(self, lang="en", directory=CATALOG_DIR):
+        self.lang = lang
+        self.directory = directory
+        self.path = join(directory, "catalog_%s.json.gz" % lang)
+        self.logger = Logger()
+        self._lock = RLock()
+        self.continents = []
+        self.countries = []
+        self.categories = []
+        self.locations = {}  # country url -> [{name, url}]
+        self.webcams = {}  # location/category url -> [webcam]
+        self.updated = {}  # page url -> time it was last crawled
+        # Crawl progress: pending [kind, url] tasks of the running pass
+        self.pending = []
+        self.started = 0
+        self.finished = 0
+        # Bumped on every change so derived data (search index) can
+        # tell it is outdated
+        self.revision = 0
+
+    def get_continents(self):
+        return self.continents or None
+
+    def get_countries(self):
+        return self.countries or None
+
+    def get_categories(self):
+        return self.categories or None
+
+    def get_locations(self, country_url):
+        return self.locations.get(country_url)
+
+    def get_webcams(self, page_url):
+        return self.webcams.get(page_url)
+
+    def is_stale(self, url, max_age=CATALOG_MAX_AGE):
+        return self.updated.get(url, 0) + max_age < time()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "lang": self.lang,
+                "continents": len(self.continents),
+                "countries": len(self.countries),
+                "categories": len(self.categories),
+                "locations": sum(len(v) for v in self.locations.values()),
+                "webcams": sum(len(v) for v in self.webcams.values()),
+                "pending": len(self.pending),
+                "finished": self.finished,
+            }
+
+    def load(self):
+        """Read the snapshot; safe to call from a worker."""
+        if not exists(self.path):
+            return False
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = load(f)
+            if data.get("version") != SNAPSHOT_VERSION or \
+                    data.get("lang") != self.lang:
+                self.logger.info("Ignoring outdated catalog " + self.path)
+                return False
+            with self._lock:
+                self.continents = data.get("continents", [])
+                self.countries = data.get("countries", [])
+                self.categories = data.get("categories", [])
+                self.locations = data.get("locations", {})
+                self.webcams = data.get("webcams", {})
+                self.updated = data.get("updated", {})
+                crawl = data.get("crawl", {})
+                self.pending = crawl.get("pending", [])
+                self.started = crawl.get("started", 0)
+                self.finished = crawl.get("finished", 0)
+                self.revision += 1
+            self.logger.info("Catalog loaded: %s" % self.stats())
+            return True
+        except Exception as e:
+            self.logger.error("Error loading catalog %s: %s" % (self.path, e))
+            return False
+
+    def save(self):
+        """Write the catalog atomically; safe to call from a worker."""
+        tmp_path = self.path + ".tmp"
+        # Lists are replaced, never mutated: shallow copies are enough
+        # to write without holding the lock
+        with self._lock:
+            data = {
+                "version": SNAPSHOT_VERSION,
+                "lang": self.lang,
+                "crawled": self.finished,
+                "saved": time(),
+                "continents": self.continents,
+                "countries": self.countries,
+                "categories": self.categories,
+                "locations": dict(self.locations),
+                "webcams": dict(self.webcams),
+                "updated": dict(self.updated),
+                "crawl": {
+                    "pending": list(self.pending),
+                    "started": self.started,
+                    "finished": self.finished,
+                },
+            }
+        try:
+            if not exists(self.directory):
+                makedirs(self.directory)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            rename(tmp_path, self.path)
+            return True
+        except Exception as e:
+            self.logger.error("Error saving catalog: %s" % str(e))
+            return False
+
+
+class CatalogCrawler:
+    """
+    Walks the whole catalog in the background through the scraper
+    (homepage -> countries -> locations -> webcams), a few pages at a
+    time, only while the plugin is open and idle (see stop_crawler).
+    Progress is saved with the catalog so an interrupted pass resumes
+    where it stopped.
+
+    Refresh passes are incremental: pages crawled less than
+    CATALOG_MAX_AGE ago are skipped, only their known children are
+    checked.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.logger = Logger()
+        self.scraper = SkylineScraper(catalog.lang)
+        # Requests are spaced and retried by the "crawler" rate limit,
+        # with downloads not shared with the screens: a screen joining
+        # one would wait through its backoff
+        self.scraper.policy = "crawler"
+        self.scraper.flights = SingleFlight()
+        self.queue = deque(tuple(task) for task in catalog.pending)
+        # Every page queued during this pass, so each is crawled once
+        self.queued = set(self.queue)
+        # Tasks handed to the pool and not done yet
+        self.in_flight = set()
+        self.processed = 0
+        self.checkpointed = time()
+        self.running = False
+        self._call = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        if not self.queue and not self.in_flight:
+            wait = self.catalog.finished + CRAWL_INTERVAL - time()
+            if wait > 0:
+                self.logger.info("Catalog is up to date, crawl skipped")
+                self.running = False
+                self._schedule_restart(wait)
+                return
+            self.catalog.started = time()
+            self.catalog.finished = 0
+            self.queued.clear()
+            self._enqueue("home", BASE_URL + "/" + self.catalog.lang)
+        self.logger.info("Catalog crawl started (%d pending)" % len(self.queue))
+        self._schedule(0)
+
+    def stop(self):
+        self.running = False
+        if self._call is not None and self._call.active():
+            self._call.cancel()
+        self._call = None
+        self._checkpoint()
+
+    def _restart(self):
+        self._call = None
+        self.start()
+
+    def _schedule(self, delay):
+        if self._call is None or not self._call.active():
+            self._call = reactor.callLater(delay, self.pump)
+
+    def pump(self):
+        """Hand pending pages to the crawler pool while the box is idle."""
+        self._call = None
+        if not self.running:
+            return
+        if not is_idle():
+            self._schedule(CRAWL_IDLE_POLL)
+            return
+
+        while self.queue and len(self.in_flight) < CRAWL_WORKERS:
+            task = self.queue.popleft()
+            self.in_flight.add(task)
+            deferToThreadPool(
+                reactor,
+                get_pool("WorldCamCrawler", CRAWL_WORKERS),
+                self._crawl,
+                task
+            ).addCallbacks(
+                self._crawled, self._failed,
+                callbackArgs=(task,), errbackArgs=(task,))
+
+        if not self.queue and not self.in_flight:
+            self._finish()
+
+    def _crawl(self, task):
+        """Worker thread: fetch and parse one catalog page."""
+        kind, url = task
+        if kind == "home":
+            return {
+                "continents": self.scraper.get_continents(),
+                "countries": self.scraper.get_countries(),
+                "categories": self.scraper.get_categories(),
+            }
+        if kind == "country":
+            return self.scraper.get_locations(url)
+        return self.scraper.get_webcams(url)
+
+    def _crawled(self, result, task):
+        kind, url = task
+        self.in_flight.discard(task)
+        catalog = self.catalog
+
+        with catalog._lock:
+            if kind == "home":
+                if result["continents"]:
+                    catalog.continents = result["continents"]
+                if result["countries"]:
+                    catalog.countries = result["countries"]
+                if result["categories"]:
+                    catalog.categories = result["categories"]
+                for continent in result["continents"]:
+                    for country in continent["countries"]:
+                        self._enqueue("country", country["url"])
+                for country in result["countries"]:
+                    self._enqueue("country", country["url"])
+                for category in result["categories"]:
+                    self._enqueue("page", category["url"])
+            elif kind == "country":
+                if result:
+                    catalog.locations[url] = result
+                    catalog.updated[url] = time()
+                for location in result or []:
+                    self._enqueue("page", location["url"])
+            elif result:
+                catalog.webcams[url] = result
+                catalog.updated[url] = time()
+            catalog.revision += 1
+
+        self._done_one()
+
+    def _failed(self, failure, task):
+        self.in_flight.discard(task)
+        self.logger.error("Crawl failed for %s: %s" % (
+            task[1], failure.getErrorMessage()))
+        self._done_one()
+
+    def _done_one(self):
+        self.processed += 1
+        if not self.running:
+            # Stopped: save again once the last running page is in
+            if not self.in_flight:
+                self._checkpoint()
+            return
+        if time() - self.checkpointed >= CRAWL_CHECKPOINT_INTERVAL:
+            self._checkpoint()
+        self._schedule(0)
+
+    def _enqueue(self, kind, url):
+        task = (kind, url)
+        if task in self.queued:
+            return
+        self.queued.add(task)
+        if kind == "home" or self.catalog.is_stale(url):
+            self.queue.append(task)
+        elif kind == "country":
+            # Still fresh: only look at the locations we already know
+            for location in self.catalog.get_locations(url) or []:
+                self._enqueue("page", location["url"])
+
+    def _finish(self):
+        self.running = False
+        self.catalog.finished = time()
+        self.logger.info("Catalog crawl finished: %s" % self.catalog.stats())
+        self._checkpoint()
+        self._schedule_restart(CRAWL_INTERVAL)
+
+    def _schedule_restart(self, delay):
+        if self._call is None or not self._call.active():
+            self._call = reactor.callLater(delay, self._restart)
+
+    def _checkpoint(self):
+        self.checkpointed = time()
+        # Pages still downloading are saved as pending too: if the pass
+        # is interrupted now they are crawled again on resume
+        with self.catalog._lock:
+            tasks = list(self.in_flight) + list(self.queue)
+            self.catalog.pending = [list(task) for task in tasks]
+        deferToThreadPool(
+            reactor,
+            get_pool("WorldCamCrawler", CRAWL_WORKERS),
+            self.catalog.save)
+
+
+_catalogs = {}
+_crawlers = {}
+_loading = set()
+_wanted = None  # language start_crawler() was last called for
+
+
+def get_catalog(lang="en"):
+    """
+    Return the catalog for a language. It stays empty until
+    start_crawler() has loaded its snapshot.
+    """
+    catalog = _catalogs.get(lang)
+    if catalog is None:
+        catalog = _catalogs[lang] = Catalog(lang)
+    return catalog
+
+
+def start_crawler(lang="en"):
+    """
+    Load the language's snapshot off the GUI thread, then start (or
+    resume) the background crawl that keeps it up to date. The crawl
+    runs until stop_crawler(), called when the plugin closes.
+    """
+    global _wanted
+    note_activity()
+    _wanted = lang
+    # One language is crawled at a time
+    for other, crawler in _crawlers.items():
+        if other != lang and (crawler.running or crawler._call is not None):
+            crawler.stop()
+    crawler = _crawlers.get(lang)
+    if crawler is not None:
+        crawler.start()
+        return
+    if lang in _loading:
+        return
+    _loading.add(lang)
+    catalog = get_catalog(lang)
+
+    def loaded(result):
+        _loading.discard(lang)
+        crawler = _crawlers[lang] = CatalogCrawler(catalog)
+        # The plugin may have been closed (or switched language) while
+        # the snapshot was loading
+        if _wanted == lang:
+            crawler.start()
+
+    run_async(catalog.load).addBoth(loaded)
+
+
+def stop_crawler():
+    """
+    Stop every crawl, scheduled restarts included, and save its
+    progress. Pages already downloading finish, no new ones start.
+    """
+    global _wanted
+    _wanted = None
+    for crawler in _crawlers.values():
+        if crawler.running or crawler._call is not None:
+            crawler.stop()
@@ -10,6 +10,12 @@ from urllib.parse import quote_plus, urlparse
 import http.cookiejar as cookielib
 from urllib.request import ProxyHandler
 
+from .breaker import guard
+from .network import get_session, get_ssl_context
+from .resolver import CachedHTTPHandler, CachedHTTPSHandler
+from .timings import begin, end, timing_stats
+from .ratelimit import call_with_retry
+
 '''
     Tulip routine libraries, based on lambda's lamlib
     Author Twilight0
@@ -36,6 +42,114 @@ except ImportError:
     requester = None
 
 
+# Largest body request() returns unless limit / max_size say otherwise
+MAX_RESPONSE_SIZE = 5 * 1024 * 1024
+
+# Bodies are read in pieces of this size: a single read(cap) would
+# allocate the whole cap up front, however small the page is
+RESPONSE_CHUNK_SIZE = 16 * 1024
+
+
+class ResponseStream(object):
+    """
+    Body of a response read piece by piece and capped at limit bytes
+    (None: no cap). on_chunk(chunk), if given, sees every piece and
+    stops the reading by returning True; the piece that stopped it is
+    still delivered. Iterate it for the pieces or read() them joined.
+    """
+
+    def __init__(self, response, limit=MAX_RESPONSE_SIZE,
+                 chunk_size=RESPONSE_CHUNK_SIZE, on_chunk=None):
+        self.response = response
+        self.code = response.getcode()
+        self.headers = response.headers
+        self.limit = limit
+        self.chunk_size = chunk_size
+        self.on_chunk = on_chunk
+        self.received = 0
+        self.truncated = False  # stopped at the cap
+        self.aborted = False  # stopped by on_chunk
+
+    def __iter__(self):
+        while True:
+            size = self.chunk_size
+            if self.limit is not None:
+                if self.received >= self.limit:
+                    self.truncated = True
+                    return
+                size = min(size, self.limit - self.received)
+            chunk = self.response.read(size)
+            if not chunk:
+                return
+            self.received += len(chunk)
+            stop = self.on_chunk is not None and self.on_chunk(chunk)
+            yield chunk
+            if stop:
+                self.aborted = True
+                return
+
+    def read(self):
+        data = bytearray()
+        for chunk in self:
+            data += chunk
+        return bytes(data)
+
+    def geturl(self):
+        return self.response.geturl()
+
+    def getcode(self):
+        return self.code
+
+    def close(self):
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class NoRedirectHandler(urllib_request.HTTPRedirectHandler):
+    """Hand 3xx responses back to the caller instead of following them."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Client(object):
+    """
+    urllib client owning its opener: proxy, cookie jar, SSL context and
+    redirect policy belong to the instance and the process-wide opener
+    (install_opener) is never touched, so clients can be used from
+    several threads at once.
+    """
+
+    def __init__(self, proxy=None, cookies=None, redirect=True,
+                 verify=False):
+        self.cookies = cookies if cookies is not None \
+            else cookielib.LWPCookieJar()
+        handlers = [CachedHTTPHandler(),
+                    CachedHTTPSHandler(context=get_ssl_context(verify)),
+                    urllib_request.HTTPCookieProcessor(self.cookies)]
+        if proxy is not None:
+            handlers.insert(0, ProxyHandler({'http': '{0}'.format(proxy)}))
+        if redirect is False:
+            handlers.append(NoRedirectHandler())
+        self.opener = urllib_request.build_opener(*handlers)
+
+    def open(self, url, data=None, headers=None, timeout=30):
+        """Open url (a str or a Request); raises HTTPError for >= 400."""
+        if isinstance(url, urllib_request.Request):
+            req = url
+        else:
+            req = urllib_request.Request(url, data=data, headers=headers or {})
+        return self.opener.open(req, timeout=int(timeout))
+
+    def cookie_header(self):
+        return '; '.join(['%s=%s' % (i.name, i.value) for i in self.cookies])
+
+
 def request(
         url,
         close=True,
@@ -49,40 +163,29 @@ def request(
         referer=None,
         cookie=None,
         output='',
-        timeout='30'):
-    handlers = []
-
-    if proxy is not None:
-        handlers += [ProxyHandler({'http': '{0}'.format(proxy)}),
-                     urllib_request.HTTPHandler]
-        opener = urllib_request.build_opener(*handlers)
-        urllib_request.install_opener(opener)
-
-    if output == 'cookie' or output == 'extended' or close is not True:
-        cookies = cookielib.LWPCookieJar()
-        handlers += [urllib_request.HTTPHandler(),
-                     urllib_request.HTTPSHandler(),
-                     urllib_request.HTTPCookieProcessor(cookies)]
-        opener = urllib_request.build_opener(*handlers)
-        urllib_request.install_opener(opener)
-
-    try:
-
-        import ssl
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        handlers += [urllib_request.HTTPSHandler(context=ssl_context)]
-        opener = urllib_request.build_opener(*handlers)
-        urllib_request.install_opener(opener)
-
-    except BaseException:
-        pass
-
-    try:
-        headers.update(headers)
-    except BaseException:
-        headers = {}
+        timeout='30',
+        policy='client',
+        max_size=None,
+        on_chunk=None):
+    """
+    Fetch url; output selects what is returned. Bodies are read through
+    a ResponseStream capped by limit (KiB) or else max_size (bytes,
+    default MAX_RESPONSE_SIZE); on_chunk is its early-abort callback.
+    output='stream' returns the ResponseStream itself, unread: the
+    caller iterates it and closes it.
+    """
+    # Plain requests go through the shared keep-alive session; proxies and
+    # cookie output still need a urllib opener
+    pooled = (proxy is None and close is True
+              and output not in ('cookie', 'extended'))
+
+    if not pooled:
+        # A client of its own: concurrent calls never share handlers
+        client = Client(proxy=proxy, redirect=redirect)
+        cookies = client.cookies
+
+    # Work on a copy: the caller's dict may be shared between threads
+    headers = dict(headers or {})
 
     if 'User-Agent' in headers:
         pass
@@ -107,30 +210,73 @@ def request(
 
     if redirect is False:
 
-        class NoRedirection(urllib_error.HTTPError):
-
-            def http_response(self, request, response):
-                return response
-
-        opener = urllib_request.build_opener(NoRedirection)
-        urllib_request.install_opener(opener)
-
         try:
             del headers['Referer']
         except BaseException:
             pass
 
-    req = urllib_request.Request(url, data=post, headers=headers)
+    if pooled:
+        if post is not None and 'Content-Type' not in headers:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        response = get_session().request(
+            url,
+            method='GET' if post is None else 'POST',
+            headers=headers,
+            body=post,
+            timeout=int(timeout),
+            verify=False,
+            allow_redirects=redirect is not False,
+            policy=policy)
+
+        if response.code >= 400:
+            if response.code == 503:
+                print('error 503 ')
+            elif error is False:
+                response.close()
+                return
 
-    try:
-        response = urllib_request.urlopen(req, timeout=int(timeout))
-
-    except urllib_error.HTTPError as response:
+    else:
+        req = urllib_request.Request(url, data=post, headers=headers)
+
+        def open_url():
+            timing = begin(url)
+            try:
+                response = client.open(req, timeout=timeout)
+            except urllib_error.HTTPError as e:
+                response = e
+            except Exception:
+                end()
+                timing_stats.record(timing)
+                raise
+            end()
+            timing.status = response.getcode()
+            timing.add('ttfb', time.perf_counter() - timing.started -
+                       timing.connecting())
+            timing_stats.record(timing)
+            return response
+
+        # One breaker failure per request, however many retries it took
+        response = guard(url, lambda: call_with_retry(
+            policy, url, open_url, 'GET' if post is None else 'POST'))
+
+        if response.getcode() >= 400:
+
+            if response.code == 503:
+                print('error 503 ')
+            elif error is False:
+                response.close()
+                return
+
+    if limit == '0':
+        cap = 224 * 1024
+    elif limit is not None:
+        cap = int(limit) * 1024
+    else:
+        cap = max_size or MAX_RESPONSE_SIZE
+    body = ResponseStream(response, cap, on_chunk=on_chunk)
 
-        if response.code == 503:
-            print('error 503 ')
-        elif error is False:
-            return
+    if output == 'stream':
+        return body
 
     if output == 'cookie':
 
@@ -141,12 +287,7 @@ def request(
 
     elif output == 'response':
 
-        if limit == '0':
-            result = (str(response.code), response.read(224 * 1024))
-        elif limit is not None:
-            result = (str(response.code), response.read(int(limit) * 1024))
-        else:
-            result = (str(response.code), response.read(5242880))
+        result = (str(response.code), body.read())
 
     elif output == 'chunk':
 
@@ -156,6 +297,7 @@ def request(
             content = (2049 * 1024)
 
         if content < (2048 * 1024):
+            response.close()
             return
         result = response.read(16 * 1024)
 
@@ -167,23 +309,16 @@ def request(
             pass
 
         content = response.headers
-        result = response.read(5242880)
-        return result, headers, content, cookie
+        result = (body.read(), headers, content, cookie)
 
     elif output == 'geturl':
         result = response.geturl()
 
     elif output == 'headers':
-        content = response.headers
-        return content
+        result = response.headers
 
     else:
-        if limit == '0':
-            result = response.read(224 * 1024)
-        elif limit is not None:
-            result = response.read(int(limit) * 1024)
-        else:
-            result = response.read(5242880)
+        result = body.read()
 
     if close is True:
         response.close()
@@ -443,11 +578,10 @@ def spoofer(_agent=True, age_str=randomagent(), referer=False, ref_str=''):
 def cfcookie(netloc, ua, timeout):
     try:
         headers = {'User-Agent': ua}
-
-        req = urllib_request.Request(netloc, headers=headers)
+        client = Client()
 
         try:
-            urllib_request.urlopen(req, timeout=int(timeout))
+            client.open(netloc, headers=headers, timeout=timeout)
         except urllib_request.HTTPError as response:
             result = response.read(5242880)
 
@@ -482,23 +616,14 @@ def cfcookie(netloc, ua, timeout):
                 netloc, quote_plus(passval), jschl, answer)
             time.sleep(5)
 
-        cookies = cookielib.LWPCookieJar()
-        handlers = [
-            urllib_request.HTTPHandler(),
-            urllib_request.HTTPSHandler(),
-            urllib_request.HTTPCookieProcessor(cookies)]
-        opener = urllib_request.build_opener(*handlers)
-        urllib_request.install_opener(opener)
+        client = Client()
 
         try:
-            request = urllib_request.Request(query, headers=headers)
-            urllib_request.urlopen(request, timeout=int(timeout))
+            client.open(query, headers=headers, timeout=timeout)
         except BaseException:
             pass
 
-        cookie = '; '.join(['%s=%s' % (i.name, i.value) for i in cookies])
-
-        return cookie
+        return client.cookie_header()
     except BaseException:
         pass
 
@@ -1,8 +1,9 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from re import findall, finditer, compile, sub, DOTALL, match as re_match, S, I, M
-from collections import namedtuple
+from re import finditer, compile, escape, sub, DOTALL, match as re_match, S, I
+from collections import OrderedDict, namedtuple
+from threading import Lock
 
 """
    Based on Parsedom for XBMC plugins
@@ -28,84 +29,167 @@ def iteritems(d, **kw):
 DomMatch = namedtuple('DOMMatch', ['attrs', 'content'])
 re_type = type(compile(''))
 
-
-def __get_dom_content(html, name, match):
-    if match.endswith('/>'):
+# Opening and closing tags; the name is kept as written because end
+# tags are balanced case-sensitively
+_tag_re = compile(r'<(/?)([^\s/>!]+)')
+
+# Documents whose tag index is kept for further queries
+INDEX_CACHE_SIZE = 4
+
+_indexes = OrderedDict()
+_indexes_lock = Lock()
+
+
+class _DomIndex(object):
+    """
+    Offsets of every tag of one document, collected in a single pass,
+    plus the end tag of each start tag (computed once per tag name).
+    """
+
+    def __init__(self, html):
+        self.html = html
+        self.opens = {}  # name as written -> [start offsets]
+        self.closes = {}  # name as written -> [start offsets]
+        for match in _tag_re.finditer(html):
+            table = self.closes if match.group(1) else self.opens
+            table.setdefault(match.group(2), []).append(match.start())
+        self._ends = {}
+        self._names = {}
+
+    def names(self, name):
+        """Names as written in the document that equal name ignoring case."""
+        key = name.lower()
+        names = self._names.get(key)
+        if names is None:
+            names = self._names[key] = [
+                written for written in self.opens if written.lower() == key]
+        return names
+
+    def tags(self, name):
+        """
+        Yield (start, stop) of each start tag of name (any case) in
+        document order, stop being just past its ">".
+        """
+        html = self.html
+        starts = sorted(
+            start for written in self.names(name)
+            for start in self.opens[written])
+        gt = -1
+        for start in starts:
+            if gt < start:
+                gt = html.find('>', start)
+                if gt < 0:
+                    return
+            yield start, gt + 1
+
+    def end_of(self, name, start):
+        """
+        Offset of the end tag balancing the start tag of name at start,
+        -1 if there is no end tag after it. Start tags left open end at
+        the last end tag, as the former find() loop did.
+        """
+        ends = self._ends.get(name)
+        if ends is None:
+            ends = self._ends[name] = self._match(name)
+        return ends.get(start, -1)
+
+    def _match(self, name):
+        opens = self.opens.get(name, [])
+        closes = self.closes.get(name, [])
+        ends = {}
+        stack = []
+        i = 0
+        for close in closes:
+            while i < len(opens) and opens[i] < close:
+                stack.append(opens[i])
+                i += 1
+            if stack:
+                ends[stack.pop()] = close
+        if closes:
+            for start in stack:
+                ends[start] = closes[-1]
+        return ends
+
+
+def _get_index(html):
+    with _indexes_lock:
+        index = _indexes.get(html)
+        if index is not None:
+            _indexes.move_to_end(html)
+            return index
+    index = _DomIndex(html)
+    with _indexes_lock:
+        _indexes[html] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def __get_dom_content(index, element, start, stop):
+    if element.endswith('/>'):
         return ''
 
-    # override tag name with tag from match if possible
-    tag = re_match(r'<([^\s/>]+)', match)
-    if tag:
-        name = tag.group(1)
-
-    start_str = '<%s' % name
-    end_str = "</%s" % name
-
-    # start/end tags without matching case cause issues
-    start = html.find(match)
-    end = html.find(end_str, start)
-    pos = html.find(start_str, start + 1)
-
-    while pos < end and pos != -1:  # Ignore too early </endstr> return
-        tend = html.find(end_str, end + len(end_str))
-        if tend != -1:
-            end = tend
-        pos = html.find(start_str, pos + 1)
-
-    if start == -1 and end == -1:
-        result = ''
-    elif start > -1 and end > -1:
-        result = html[start + len(match):end]
-    elif end > -1:
-        result = html[:end]
-    elif start > -1:
-        result = html[start + len(match):]
-    else:
-        result = ''
-
-    return result
-
-
-def __get_dom_elements(item, name, attrs):
-    if not attrs:
-        pattern = r'(<%s(?:\s[^>]*>|/?>))' % name
-        this_list = findall(pattern, item, M | S | I)
-    else:
-        last_list = None
-        for key, value in iteritems(attrs):
-            value_is_regex = isinstance(value, re_type)
-            value_is_str = isinstance(value, str)
-            pattern = r'''(<{tag}[^>]*\s{key}=(?P<delim>['"])(.*?)(?P=delim)[^>]*>)'''.format(
-                tag=name, key=key)
-            re_list = findall(pattern, item, M | S | I)
+    # balance with the tag name as written in the element
+    name = re_match(r'<([^\s/>]+)', element).group(1)
+    end = index.end_of(name, start)
+    if end > -1:
+        return index.html[stop:end]
+    return index.html[stop:]
+
+
+def __attr_patterns(key):
+    quoted = compile(
+        r'''\s{key}=(?P<delim>['"])(.*?)(?P=delim)'''.format(key=key),
+        S | I)
+    unquoted = compile(
+        r'''\s{key}=((?:[^\s>]|/>)*)'''.format(key=key), S | I)
+    return quoted, unquoted
+
+
+def __get_dom_elements(index, name, attrs):
+    """
+    (start, stop) of the start tags of name whose attributes satisfy
+    attrs, in document order. Every tag is read once per attribute.
+    """
+    html = index.html
+    pattern = compile(r'<%s(?:\s[^>]*>|/?>)' % escape(name), I)
+    elements = [(start, stop) for start, stop in index.tags(name)
+                if pattern.match(html, start, stop)]
+    for key, value in iteritems(attrs):
+        value_is_regex = isinstance(value, re_type)
+        value_is_str = isinstance(value, str)
+        quoted, unquoted = __attr_patterns(key)
+        temp_value = set([value] if value_is_str else value) \
+            if not value_is_regex else None
+
+        this_list = []
+        for start, stop in elements:
+            found = quoted.search(html, start, stop)
+            if not found:
+                continue
             if value_is_regex:
-                this_list = [r[0] for r in re_list if re_match(value, r[2])]
-            else:
-                temp_value = [value] if value_is_str else value
-                this_list = [r[0] for r in re_list if set(
-                    temp_value) <= set(r[2].split(' '))]
-
-            if not this_list:
-                has_space = (
-                    value_is_regex and ' ' in value.pattern) or (
-                    value_is_str and ' ' in value)
-                if not has_space:
-                    pattern = r'''(<{tag}[^>]*\s{key}=((?:[^\s>]|/>)*)[^>]*>)'''.format(
-                        tag=name, key=key)
-                    re_list = findall(pattern, item, M | S | I)
+                if re_match(value, found.group(2)):
+                    this_list.append((start, stop))
+            elif temp_value <= set(found.group(2).split(' ')):
+                this_list.append((start, stop))
+
+        if not this_list:
+            has_space = (
+                value_is_regex and ' ' in value.pattern) or (
+                value_is_str and ' ' in value)
+            if not has_space:
+                for start, stop in elements:
+                    found = unquoted.search(html, start, stop)
+                    if not found:
+                        continue
                     if value_is_regex:
-                        this_list = [r[0]
-                                     for r in re_list if re_match(value, r[1])]
-                    else:
-                        this_list = [r[0] for r in re_list if value == r[1]]
-
-            if last_list is None:
-                last_list = this_list
-            else:
-                last_list = [item for item in this_list if item in last_list]
-        this_list = last_list
+                        if re_match(value, found.group(1)):
+                            this_list.append((start, stop))
+                    elif value == found.group(1):
+                        this_list.append((start, stop))
 
-    return this_list
+        elements = this_list
+    return elements
 
 
 def __get_attribs(element):
@@ -156,14 +240,15 @@ def parse_dom(html, name='', attrs=None, req=False, exclude_comments=False):
         if exclude_comments:
             item = sub(compile('<!--.*?-->', DOTALL), '', item)
 
+        index = _get_index(item)
         results = []
-        for element in __get_dom_elements(item, name, attrs):
+        for start, stop in __get_dom_elements(index, name, attrs):
+            element = item[start:stop]
             attribs = __get_attribs(element)
             if req and not req <= set(attribs.keys()):
                 continue
-            temp = __get_dom_content(item, name, element).strip()
+            temp = __get_dom_content(index, element, start, stop).strip()
             results.append(DomMatch(attribs, temp))
-            item = item[item.find(temp, item.find(element)):]
         all_results += results
 
     return all_results
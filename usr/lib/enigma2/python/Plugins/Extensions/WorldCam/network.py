@@ -0,0 +1,465 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import ssl
+import zlib
+from http.client import BadStatusLine, RemoteDisconnected
+from threading import Lock
+from time import perf_counter, time
+from urllib.parse import urljoin, urlsplit
+
+from .breaker import guard
+from .ratelimit import call_with_retry
+from .resolver import CachedHTTPConnection, CachedHTTPSConnection
+from .timings import begin, end, timing_stats
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam HTTP Session for Plugin                     #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+# Idle keep-alive connections kept per (scheme, host, port)
+POOL_MAXSIZE_PER_HOST = 4
+
+# Idle connections older than this are closed instead of reused (seconds)
+POOL_IDLE_TIMEOUT = 60
+
+DEFAULT_TIMEOUT = 15
+MAX_REDIRECTS = 5
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Offered to servers unless the caller sets its own Accept-Encoding
+ACCEPT_ENCODING = "gzip, deflate"
+
+# Size of the raw reads fed to the decompressor
+READ_CHUNK_SIZE = 16 * 1024
+
+# Errors raised when a pooled connection was closed by the server
+STALE_CONNECTION_ERRORS = (
+    BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    RemoteDisconnected,
+)
+
+_ssl_contexts = {}
+_ssl_lock = Lock()
+
+
+def get_ssl_context(verify=True):
+    """Return a cached SSL context (certificate checks off if not verify)."""
+    with _ssl_lock:
+        context = _ssl_contexts.get(verify)
+        if context is None:
+            context = ssl.create_default_context()
+            if not verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            _ssl_contexts[verify] = context
+        return context
+
+
+class TransferStats:
+    """Process-wide counters of bytes received vs. bytes after decoding."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.wire_bytes = 0
+            self.decoded_bytes = 0
+            self.responses = 0
+            self.compressed_responses = 0
+
+    def add(self, wire, decoded):
+        with self._lock:
+            self.wire_bytes += wire
+            self.decoded_bytes += decoded
+
+    def count_response(self, compressed):
+        with self._lock:
+            self.responses += 1
+            if compressed:
+                self.compressed_responses += 1
+
+    def stats(self):
+        with self._lock:
+            saved = self.decoded_bytes - self.wire_bytes
+            return {
+                "responses": self.responses,
+                "compressed_responses": self.compressed_responses,
+                "wire_bytes": self.wire_bytes,
+                "decoded_bytes": self.decoded_bytes,
+                "saved_bytes": saved,
+                "ratio": (round(float(self.decoded_bytes) / self.wire_bytes, 2)
+                          if self.wire_bytes else 1.0),
+            }
+
+
+transfer_stats = TransferStats()
+
+
+def _make_decoder(content_encoding):
+    """Return a zlib decompressor for the Content-Encoding, or None."""
+    encoding = (content_encoding or "").strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompressobj(zlib.MAX_WBITS)
+    return None
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of idle keep-alive connections, per host.
+    A connection is used by one request at a time and only returned to
+    the pool once its response body has been read completely.
+    """
+
+    def __init__(self, maxsize=POOL_MAXSIZE_PER_HOST,
+                 idle_timeout=POOL_IDLE_TIMEOUT):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._idle = {}  # key -> [(conn, released_at), ...]
+        self._lock = Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, scheme, host, port, timeout, verify=True):
+        """Return (key, conn, reused) for the given origin."""
+        key = (scheme, host, port, verify)
+        now = time()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, released_at = idle.pop()
+                if now - released_at < self.idle_timeout:
+                    self.reused += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return key, conn, True
+                conn.close()
+            self.created += 1
+
+        # Host names resolve through the shared DNS cache
+        if scheme == "https":
+            conn = CachedHTTPSConnection(
+                host, port, timeout=timeout, context=get_ssl_context(verify))
+        else:
+            conn = CachedHTTPConnection(host, port, timeout=timeout)
+        return key, conn, False
+
+    def release(self, key, conn):
+        """Give a connection back for reuse, or close it if the pool is full."""
+        if conn.sock is None:
+            conn.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append((conn, time()))
+                return
+        conn.close()
+
+    def clear(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _released_at in idle:
+                    conn.close()
+            self._idle.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "hosts": len(self._idle),
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+
+class Response:
+    """
+    Response of HTTPSession.request, compatible with the parts of the
+    urllib response API used in the plugin (read, geturl, getcode,
+    headers, close).
+
+    gzip/deflate bodies are decompressed incrementally while reading, so
+    the compressed body is never held in memory as a whole; read(amt)
+    counts decoded bytes.
+    """
+
+    # Unread bodies up to this size are drained so the connection survives
+    DRAIN_LIMIT = 64 * 1024
+
+    def __init__(self, url, raw, pool, key, conn, timing=None):
+        self.url = url
+        self.raw = raw
+        self.status = raw.status
+        self.code = raw.status
+        self.reason = raw.reason
+        self.headers = raw.headers
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._decoder = _make_decoder(raw.headers.get("Content-Encoding"))
+        # Some servers send raw deflate without the zlib header
+        self._deflate_probe = (
+            self._decoder is not None
+            and raw.headers.get("Content-Encoding", "").strip().lower()
+            == "deflate")
+        self._buffer = bytearray()
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        transfer_stats.count_response(self._decoder is not None)
+        # Completed with the transfer time once the body is consumed
+        self._timing = timing
+        self._headers_at = perf_counter()
+
+    def read(self, amt=None):
+        if self._decoder is None:
+            data = self.raw.read() if amt is None else self.raw.read(amt)
+            self._count(len(data), len(data))
+        else:
+            data = self._read_decoded(amt)
+        if self.raw.isclosed():
+            self._release()
+        return data
+
+    def iter_content(self, chunk_size=16384):
+        """Yield the body in chunks of at most chunk_size bytes."""
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def geturl(self):
+        return self.url
+
+    def getcode(self):
+        return self.status
+
+    def info(self):
+        return self.headers
+
+    def close(self, drain=True):
+        """
+        Release the connection, dropping it if the body was not consumed.
+        drain=False drops it even when the rest would fit DRAIN_LIMIT,
+        for callers that stop reading to save the transfer time.
+        """
+        if self._conn is None:
+            return
+        if drain and not self.raw.isclosed():
+            length = self.raw.length
+            if length is not None and length <= self.DRAIN_LIMIT:
+                try:
+                    self.raw.read()
+                except Exception:
+                    pass
+        if self.raw.isclosed():
+            self._release()
+        else:
+            self.raw.close()
+            self._conn.close()
+            self._conn = None
+            self._record_timing()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _read_decoded(self, amt):
+        buffer = self._buffer
+        while amt is None or len(buffer) < amt:
+            tail = self._decoder.unconsumed_tail
+            if tail:
+                chunk, wire = tail, 0
+            else:
+                chunk = self.raw.read(READ_CHUNK_SIZE)
+                wire = len(chunk)
+                if not chunk:
+                    if not self._decoder.eof:
+                        out = self._decoder.flush()
+                        buffer += out
+                        self._count(0, len(out))
+                    break
+            limit = 0 if amt is None else amt - len(buffer)
+            out = self._decompress(chunk, limit)
+            buffer += out
+            self._count(wire, len(out))
+
+        if amt is None or len(buffer) <= amt:
+            data = bytes(buffer)
+            buffer.clear()
+        else:
+            data = bytes(buffer[:amt])
+            del buffer[:amt]
+        return data
+
+    def _decompress(self, chunk, limit):
+        try:
+            out = self._decoder.decompress(chunk, limit)
+        except zlib.error:
+            if not self._deflate_probe:
+                raise
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            out = self._decoder.decompress(chunk, limit)
+        self._deflate_probe = False
+        return out
+
+    def _count(self, wire, decoded):
+        self.wire_bytes += wire
+        self.decoded_bytes += decoded
+        transfer_stats.add(wire, decoded)
+
+    def _release(self):
+        if self._conn is not None:
+            self._pool.release(self._key, self._conn)
+            self._conn = None
+        self._record_timing()
+
+    def _record_timing(self):
+        timing = self._timing
+        if timing is None:
+            return
+        self._timing = None
+        timing.add("transfer", perf_counter() - self._headers_at)
+        timing.wire_bytes = self.wire_bytes
+        timing.decoded_bytes = self.decoded_bytes
+        timing_stats.record(timing)
+
+
+class HTTPSession:
+    """
+    Minimal HTTP client on top of http.client with a shared keep-alive
+    connection pool and cached SSL contexts, safe to use from several
+    worker threads at once.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool or ConnectionPool()
+
+    def request(self, url, method="GET", headers=None, body=None,
+                timeout=DEFAULT_TIMEOUT, verify=True, allow_redirects=True,
+                policy=None):
+        """
+        Perform a request and return a Response (any status code).
+        The caller must read the body or close() the response.
+
+        policy names the calling subsystem (see ratelimit.POLICIES): the
+        request is then rate limited per host and retried on 429/5xx
+        and connection errors.
+
+        The host's circuit breaker sees the outcome of the whole request
+        (retries included), so one request counts as one failure at most.
+        """
+        headers = dict(headers or {})
+        if not any(key.lower() == "accept-encoding" for key in headers):
+            headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        def send():
+            return self._request(url, method, dict(headers), body, timeout,
+                                 verify, allow_redirects)
+
+        if policy is None:
+            return guard(url, send)
+        # Hosts that keep failing are not contacted until they recover
+        return guard(url, lambda: call_with_retry(policy, url, send, method))
+
+    def _request(self, url, method, headers, body, timeout, verify,
+                 allow_redirects):
+        for _hop in range(MAX_REDIRECTS + 1):
+            response = self._send(url, method, headers, body, timeout, verify)
+            if not allow_redirects or response.status not in REDIRECT_CODES:
+                return response
+
+            location = response.headers.get("Location")
+            response.close()
+            if not location:
+                return response
+            url = urljoin(url, location)
+            if response.status == 303 or (
+                    response.status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+                headers.pop("Content-Type", None)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request(url, "GET", **kwargs)
+
+    def _send(self, url, method, headers, body, timeout, verify):
+        return self._open(url, method, headers, body, timeout, verify)
+
+    def _open(self, url, method, headers, body, timeout, verify):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError("Unsupported URL scheme: " + url)
+        host = parts.hostname
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        # A reused connection may have been closed by the server while
+        # idle: retry once on a fresh one
+        for attempt in (0, 1):
+            key, conn, reused = self.pool.acquire(
+                scheme, host, port, timeout, verify)
+            timing = begin(url)
+            timing.reused = reused
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                raw = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                end()
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                timing_stats.record(timing)
+                raise
+            except Exception:
+                end()
+                conn.close()
+                timing_stats.record(timing)
+                raise
+            end()
+            timing.status = raw.status
+            timing.add("ttfb", perf_counter() - timing.started -
+                       timing.connecting())
+            return Response(url, raw, self.pool, key, conn, timing)
+
+
+_session = None
+_session_lock = Lock()
+
+
+def get_session():
+    """Return the process-wide HTTPSession."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = HTTPSession()
+        return _session
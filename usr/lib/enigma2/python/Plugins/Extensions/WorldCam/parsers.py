@@ -0,0 +1,470 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from re import DOTALL, compile, escape
+from threading import Lock
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Page Parsers for Plugin                     #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+# Bump whenever a parser returns something different for the same page:
+# parse results cached by older versions are then ignored
+PARSER_VERSION = 1
+
+# A webcam tile of the skylinewebcams grid opens with
+#   <a href="..." class="... col-xs-12 ... col-sm-6 ... col-md-4 ...">
+# followed, before the next tile, by its <img src=".." alt="..">,
+# <p class="tcam">name</p> and <p class="subt">description</p>. The
+# grid is read by an index-driven scanner (see scan_grid) rather than
+# one regex with chained .*? groups, which backtracks polynomially on
+# tiles missing a field.
+GRID_CLASSES = ("col-xs-12", "col-sm-6", "col-md-4")
+
+LOCATION_PATTERN = (
+    r'<a href="([^"]+)" class="[^"]*\bbtn\b[^"]*\bbtn-primary\b[^"]*"'
+    r'[^>]*>([^<]+)</a>')
+
+# Homepage items, all found by parse_homepage in a single pass; {lang}
+# is the (escaped) language code of the page. A continent block ends at
+# the first CONTINENT_END after its heading.
+CONTINENT_PATTERN = (
+    r'<div class="continent\s+(\w+)"><strong>([^<]+)</strong></div>')
+CONTINENT_END = r'</div>\s*</div>'
+COUNTRY_PATTERN = r'<a href="(/{lang}/webcam/[^"]+\.html)">([^<]+)</a>'
+CATEGORY_PATTERN = (
+    r'<a href="(/{lang}/[^"]+)"[^>]*>\s*<p class="tcam">([^<]+)</p>')
+
+# Markers of the stream URL in a webcam page: (name, pattern, opening).
+# A pattern that can span several tags has the literal text it starts
+# with as opening. The order only breaks ties within one chunk, see
+# MarkerScanner.
+STREAM_MARKERS = (
+    ("hls", r"source:\s*'livee\.m3u8\?a=([^']+)'", None),
+    ("youtube", r"videoId:\s*'([^']+)'", None),
+    ("jwplayer", r'player\.setup\({.*?file:\s*"([^"]+)"', "player.setup({"),
+    ("hls_url", r"hls:\s*'([^']+)'", None),
+)
+
+# Last resort once the whole page is known
+VIDEO_TAG_PATTERN = r'<video[^>]+src="([^"]+)"'
+
+# Longest tag/anchor we expect; only this much of an unfinished chunk
+# tail has to be kept for the next one
+MAX_TAG_LENGTH = 1024
+
+# Applied to one tag at a time (bounded by MAX_TAG_LENGTH)
+_anchor_tag_re = compile(r'<a\s+href="([^"]+)"\s+class="([^"]*)"')
+_img_tag_re = compile(r'<img\s+src="([^"]+)"[^>]*alt="([^"]*)"')
+_tcam_re = compile(r'<p\s+class="tcam">')
+_subt_re = compile(r'<p\s+class="subt">')
+_location_re = compile(LOCATION_PATTERN)
+_video_tag_re = compile(VIDEO_TAG_PATTERN)
+
+_homepage_res = {}  # language -> compiled homepage pattern
+_homepage_res_lock = Lock()
+
+
+def webcam_record(fields, base_url):
+    """
+    Build the webcam dict for the (href, thumbnail, alt, name,
+    description) of a grid tile (None for ads).
+    """
+    href, thumbnail, alt, name, description = fields
+    name = name.strip()
+    if "Advertisement" in name or not href:
+        return None
+    if href.startswith('http'):
+        full_url = href
+    else:
+        full_url = base_url + (href if href.startswith('/') else '/' + href)
+    return {
+        "url": full_url,
+        "thumbnail": thumbnail,
+        "alt": alt,
+        "name": name,
+        "description": description.strip()
+    }
+
+
+def _tags(html, name, pos=0, end=None):
+    """
+    Yield (start, stop) of each "<name ...>" tag in html[pos:end], stop
+    being just past its ">"; tags longer than MAX_TAG_LENGTH are
+    skipped. The next ">" is looked up once for all the tags in front
+    of it, so the scan stays linear on runs of unclosed tags.
+    """
+    if end is None:
+        end = len(html)
+    opening = "<" + name
+    gt = -1
+    while True:
+        start = html.find(opening, pos, end)
+        if start < 0:
+            return
+        pos = start + len(opening)
+        if pos < end and not html[pos].isspace():
+            continue  # another tag, e.g. <abbr for <a
+        if gt < pos:
+            gt = html.find(">", pos, end)
+            if gt < 0:
+                return
+        if gt - start < MAX_TAG_LENGTH:
+            yield start, gt + 1
+
+
+def _grid_href(html, start, stop):
+    """href of the grid tile opened by the tag html[start:stop], or None."""
+    match = _anchor_tag_re.match(html, start, stop)
+    if not match:
+        return None
+    classes = match.group(2)
+    i = 0
+    for name in GRID_CLASSES:
+        i = classes.find(name, i)
+        if i < 0:
+            return None
+        i += len(name)
+    return match.group(1)
+
+
+def grid_anchors(html, pos=0):
+    """Yield (start, stop, href) of each grid tile opening tag."""
+    for start, stop in _tags(html, "a", pos):
+        href = _grid_href(html, start, stop)
+        if href:
+            yield start, stop, href
+
+
+def _grid_starts(html, pos=0):
+    for start, _, _ in grid_anchors(html, pos):
+        yield start
+
+
+def _tile_fields(html, pos, end):
+    """
+    (thumbnail, alt, name, description) of the tile body html[pos:end],
+    or None if a field is missing. Every lookup moves forward only.
+    """
+    for start, stop in _tags(html, "img", pos, end):
+        img = _img_tag_re.match(html, start, stop)
+        if img:
+            break
+    else:
+        return None
+    tcam = _tcam_re.search(html, stop, end)
+    if not tcam:
+        return None
+    name_end = html.find("</p>", tcam.end(), end)
+    if name_end < 0:
+        return None
+    subt = _subt_re.search(html, name_end + 4, end)
+    if not subt:
+        return None
+    description_end = html.find("</p>", subt.end(), end)
+    if description_end < 0:
+        return None
+    return (img.group(1), img.group(2), html[tcam.end():name_end],
+            html[subt.end():description_end])
+
+
+def scan_grid(html):
+    """
+    Yield (href, body, end) for each webcam tile of a page: the tile
+    body html[body:end] runs from its opening tag to the next tile.
+    Linear in len(html).
+    """
+    previous = None
+    for start, stop, href in grid_anchors(html):
+        if previous:
+            yield previous + (start,)
+        previous = (href, stop)
+    if previous:
+        yield previous + (len(html),)
+
+
+def parse_grid(html, base_url="https://www.skylinewebcams.com"):
+    """Webcam dicts of every complete tile of the grid, in page order."""
+    webcams = []
+    for href, body, end in scan_grid(html or ""):
+        webcam = _tile_record(html, href, body, end, base_url)
+        if webcam:
+            webcams.append(webcam)
+    return webcams
+
+
+def block_record(block, base_url):
+    """Webcam dict of a block starting with a tile, None if incomplete/ad."""
+    anchor = next(grid_anchors(block), None)
+    if anchor is None or anchor[0] != 0:
+        return None
+    return _tile_record(block, anchor[2], anchor[1], len(block), base_url)
+
+
+def _tile_record(html, href, body, end, base_url):
+    fields = _tile_fields(html, body, end)
+    if fields is None:
+        return None
+    return webcam_record((href,) + fields, base_url)
+
+
+def location_name_from_url(href):
+    """Name of a location guessed from its URL (grid fallback)."""
+    parts = href.split('/')
+    if len(parts) >= 5:
+        return parts[4].replace('.html', '').replace('-', ' ').title()
+    return None
+
+
+class BlockSplitter:
+    """
+    Split streamed HTML into blocks that each start with an anchor
+    match; a block is complete once the next anchor has arrived.
+    """
+
+    def __init__(self, find_anchors):
+        # find_anchors(text, pos) yields the anchor positions from pos
+        self.find_anchors = find_anchors
+        self.buffer = ""
+        self.started = False  # buffer begins with an anchor
+        self.scan_from = 0
+
+    def feed(self, text, final=False):
+        buffer = self.buffer + text
+        blocks = []
+        start = 0 if self.started else None
+        for anchor in self.find_anchors(buffer, self.scan_from):
+            if start is not None:
+                if anchor <= start:
+                    continue
+                blocks.append(buffer[start:anchor])
+            start = anchor
+
+        if final:
+            if start is not None:
+                blocks.append(buffer[start:])
+            self.buffer, self.started, self.scan_from = "", False, 0
+        elif start is None:
+            # Nothing yet: only a partial anchor at the end can matter
+            self.buffer = buffer[-MAX_TAG_LENGTH:]
+            self.scan_from = 0
+        else:
+            self.buffer = buffer[start:]
+            self.started = True
+            self.scan_from = max(1, len(self.buffer) - MAX_TAG_LENGTH)
+        return blocks
+
+
+class TagScanner:
+    """Find complete matches of a single-tag pattern in streamed HTML."""
+
+    def __init__(self, pattern_re):
+        self.pattern_re = pattern_re
+        self.buffer = ""
+
+    def feed(self, text):
+        buffer = self.buffer + text
+        matches = list(self.pattern_re.finditer(buffer))
+        rest = buffer[matches[-1].end():] if matches else buffer
+        self.buffer = rest[-MAX_TAG_LENGTH:]
+        return matches
+
+
+class WebcamExtractor:
+    """
+    Streaming counterpart of SkylineScraper.parse_webcams: feed() it
+    decoded chunks as they arrive and it returns the webcams completed
+    so far; close() returns the rest.
+    """
+
+    def __init__(self, base_url="https://www.skylinewebcams.com"):
+        self.base_url = base_url
+        self.blocks = BlockSplitter(_grid_starts)
+
+    def feed(self, text):
+        return self._parse(self.blocks.feed(text))
+
+    def close(self):
+        return self._parse(self.blocks.feed("", final=True))
+
+    def _parse(self, blocks):
+        webcams = []
+        for block in blocks:
+            webcam = block_record(block, self.base_url)
+            if webcam:
+                webcams.append(webcam)
+        return webcams
+
+
+class LocationExtractor:
+    """
+    Streaming counterpart of SkylineScraper.parse_locations, with the
+    same feed()/close() as WebcamExtractor and {"name", "url"} dicts
+    as records; to_url turns the page href into a full URL.
+    The webcam grid fallback is only used when the page had no
+    location buttons at all.
+    """
+
+    def __init__(self, to_url=None):
+        self.to_url = to_url or (lambda href: href)
+        self.buttons = TagScanner(_location_re)
+        self.grid = BlockSplitter(_grid_starts)
+        self.found = 0
+        self.fallback = []
+
+    def feed(self, text):
+        self._collect_fallback(self.grid.feed(text))
+        return self._records(
+            (m.group(1), m.group(2)) for m in self.buttons.feed(text))
+
+    def close(self):
+        self._collect_fallback(self.grid.feed("", final=True))
+        if self.found:
+            return []
+        return self._records(self.fallback)
+
+    def _collect_fallback(self, blocks):
+        if self.found:
+            return
+        for block in blocks:
+            if '<div class="cam-light">' in block:
+                href = next(grid_anchors(block))[2]
+                name = location_name_from_url(href)
+                if name:
+                    self.fallback.append((href, name))
+
+    def _records(self, pairs):
+        records = [{"name": name, "url": self.to_url(href)}
+                   for href, name in pairs]
+        self.found += len(records)
+        return records
+
+
+class MarkerScanner:
+    """
+    Look for STREAM_MARKERS in streamed HTML so the download can stop
+    at the first one. Each chunk is searched together with the tail of
+    the text before it; a multi-tag marker is searched from its opening
+    once that has arrived.
+
+    The first chunk holding a marker decides, and only within it do the
+    markers keep their STREAM_MARKERS order. On a page with several
+    markers this can differ from searching the whole page for each
+    marker in turn (as get_stream_url did before it streamed): a
+    youtube videoId early in the page wins over an HLS source further
+    down. Waiting to rule out the preferred markers would mean reading
+    every such page to the end.
+    """
+
+    def __init__(self, markers=STREAM_MARKERS):
+        self.markers = [(name, compile(pattern, DOTALL), opening)
+                        for name, pattern, opening in markers]
+        self.text = ""
+        self.scan_from = 0
+        self.openings = {}  # marker name -> index of its opening
+
+    def feed(self, text):
+        """Return (name, match) of the first marker found, else None."""
+        self.text += text
+        for name, pattern_re, opening in self.markers:
+            match = pattern_re.search(
+                self.text, self.openings.get(name, self.scan_from))
+            if match:
+                return name, match
+            if opening and name not in self.openings:
+                found = self.text.find(opening, self.scan_from)
+                if found >= 0:
+                    self.openings[name] = found
+        self.scan_from = max(0, len(self.text) - MAX_TAG_LENGTH)
+        return None
+
+    def close(self):
+        """The whole page had no marker: (name, match) of a <video> tag."""
+        match = _video_tag_re.search(self.text)
+        return ("video", match) if match else None
+
+
+class HomepageModel:
+    """
+    Everything the plugin reads from the homepage: continents (name,
+    class and their countries sorted by name), the flat list of
+    countries in page order and the categories. Records are
+    {"name", "url"} dicts.
+    """
+
+    def __init__(self, continents=None, countries=None, categories=None):
+        self.continents = continents or []
+        self.countries = countries or []
+        self.categories = categories or []
+
+    def __eq__(self, other):
+        return (isinstance(other, HomepageModel)
+                and self.continents == other.continents
+                and self.countries == other.countries
+                and self.categories == other.categories)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __bool__(self):
+        return bool(self.continents or self.countries or self.categories)
+
+
+def _homepage_re(language):
+    with _homepage_res_lock:
+        pattern_re = _homepage_res.get(language)
+        if pattern_re is None:
+            lang = escape(language)
+            pattern_re = _homepage_res[language] = compile("|".join((
+                "(?i:(?P<continent>" + CONTINENT_PATTERN + "))",
+                "(?P<end>" + CONTINENT_END + ")",
+                "(?i:(?P<country>" + COUNTRY_PATTERN.format(lang=lang) + "))",
+                "(?P<category>" + CATEGORY_PATTERN.format(lang=lang) + ")",
+            )))
+        return pattern_re
+
+
+def parse_homepage(html, language="en", base_url=""):
+    """
+    Scan the homepage once and return its HomepageModel; base_url is
+    prepended to the page paths.
+    """
+    continents = []
+    countries = []
+    categories = []
+    continent = None  # open continent block, kept once it is closed
+    for match in _homepage_re(language).finditer(html or ""):
+        kind = match.lastgroup
+        # The groups of an item follow the named group wrapping it
+        first, second = match.group(match.lastindex + 1, match.lastindex + 2)
+        if kind == "continent":
+            if continent is None:
+                continent = {"name": second, "class": first, "countries": []}
+        elif kind == "end":
+            if continent is not None:
+                continent["countries"].sort(key=lambda c: c["name"].lower())
+                continents.append(continent)
+                continent = None
+        elif kind == "country":
+            countries.append({"name": second, "url": base_url + first})
+            if continent is not None:
+                continent["countries"].append(
+                    {"name": second, "url": base_url + first})
+        else:
+            categories.append({"name": second, "url": base_url + first})
+    return HomepageModel(continents, countries, categories)
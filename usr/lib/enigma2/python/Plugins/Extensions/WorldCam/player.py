@@ -25,6 +25,7 @@ from Screens.MessageBox import MessageBox
 from Screens.Screen import Screen
 
 from . import _
+from .catalog import set_busy
 from .scraper import SkylineScraper
 from .utils import (
     AspectManager,
@@ -287,6 +288,8 @@ class WorldCamPlayer(InfoBarBase, InfoBarMenu, InfoBarSeek, InfoBarAudioSelectio
             }
         )
         self.srefInit = self.session.nav.getCurrentlyPlayingServiceReference()
+        self.is_closed = False
+        set_busy(True)
         self.onClose.append(self.cleanup)
         self.onFirstExecBegin.append(self.start_playback)
 
@@ -364,26 +367,44 @@ class WorldCamPlayer(InfoBarBase, InfoBarMenu, InfoBarSeek, InfoBarAudioSelectio
                 "URL: {0}".format(current_webcam["url"])
             )
 
-            # Check if it's YouTube
-            stream_url = self.scraper.get_stream_url(current_webcam["url"])
-            if not stream_url:
-                self.logger.error("Could not extract stream URL")
-                self.show_error(_("Could not extract video stream"))
-                return
-
-            self.logger.info("Stream URL: {0}".format(stream_url))
-
-            if "youtube.com" in stream_url or "youtu.be" in stream_url:
-                self.logger.info("Detected YouTube stream")
-                self.play_youtube(stream_url, current_webcam["name"])
-            else:
-                self.logger.info("Detected regular stream")
-                self.play_stream(stream_url, current_webcam["name"])
+            # Resolve the stream in the worker pool, the GUI stays responsive
+            self.scraper.get_stream_url_async(
+                current_webcam["url"]
+            ).addCallback(
+                self.on_stream_url, current_webcam
+            ).addErrback(self.on_stream_error)
 
         except Exception as e:
             self.logger.error("Playback error: " + str(e))
             self.show_error(_("Playback error"))
 
+    def on_stream_url(self, stream_url, webcam):
+        """Stream URL resolved (main thread)"""
+        if self.is_closed:
+            return
+        if webcam is not self.get_current_webcam():
+            self.logger.info("Webcam changed meanwhile, ignoring stream URL")
+            return
+
+        if not stream_url:
+            self.logger.error("Could not extract stream URL")
+            self.show_error(_("Could not extract video stream"))
+            return
+
+        self.logger.info("Stream URL: {0}".format(stream_url))
+
+        # Check if it's YouTube
+        if "youtube.com" in stream_url or "youtu.be" in stream_url:
+            self.logger.info("Detected YouTube stream")
+            self.play_youtube(stream_url, webcam["name"])
+        else:
+            self.logger.info("Detected regular stream")
+            self.play_stream(stream_url, webcam["name"])
+
+    def on_stream_error(self, failure):
+        self.logger.error("Playback error: " + failure.getErrorMessage())
+        self.show_error(_("Playback error"))
+
     def play_youtube(self, url, title):
         """
         Main YouTube playback method
@@ -625,6 +646,8 @@ class WorldCamPlayer(InfoBarBase, InfoBarMenu, InfoBarSeek, InfoBarAudioSelectio
 
     def cleanup(self):
         """Cleanup resources on close"""
+        self.is_closed = True
+        set_busy(False)
         if exists('/tmp/hls.avi'):
             try:
                 remove('/tmp/hls.avi')
@@ -5,8 +5,6 @@
 from os import makedirs
 from os.path import exists, join, splitext, getsize
 
-from urllib.request import Request, urlopen
-
 # Enigma2 core
 from enigma import (
     RT_HALIGN_LEFT,
@@ -31,6 +29,8 @@ from Screens.ChoiceBox import ChoiceBox
 from Screens.Console import Console
 from Screens.MessageBox import MessageBox
 from Screens.Screen import Screen
+from Screens.VirtualKeyBoard import VirtualKeyBoard
+from Tools.NumericalTextInput import NumericalTextInput
 
 # Internal imports
 from . import (
@@ -42,8 +42,13 @@ from . import (
     PLUGIN_PATH,
     DEFAULT_ICON
 )
+from .catalog import get_catalog, note_activity, start_crawler, stop_crawler
+from .network import get_session
 from .player import WorldCamPlayer
-from .scraper import SkylineScraper
+from .resolver import prefetch
+from .scraper import SkylineScraper, note_country
+from .search_index import get_index
+from .timings import timing_stats
 from .utils import (
     CATEGORY_ICONS,
     FavoritesManager,
@@ -58,6 +63,7 @@ from .utils import (
     language_flag_mapping,
     set_current_language,
 )
+from .workers import run_async
 
 
 
@@ -284,6 +290,43 @@ class WebcamBaseScreen(Screen):
         self.skin_path = self.get_skin_path()
         self.skin = self.load_skin()
         self["list"] = WebcamList([])
+        self.is_closed = False
+        self.onClose.append(self.mark_closed)
+
+    def mark_closed(self):
+        """Remember the screen is gone so late refreshes are ignored"""
+        self.is_closed = True
+
+    def load_async(self, deferred, callback, error_text):
+        """
+        Show a loading state until deferred fires on the main thread,
+        then pass the result to callback (unless the screen was closed).
+        """
+        note_activity()
+        title = self["title"].getText()
+        self["title"].setText(_("Loading..."))
+
+        def loaded(result):
+            if self.is_closed:
+                return
+            self["title"].setText(title)
+            callback(result)
+
+        def failed(failure):
+            self.logger.error("Loading failed: %s" % failure.getErrorMessage())
+            if not self.is_closed:
+                self["title"].setText(error_text)
+
+        deferred.addCallback(loaded).addErrback(failed)
+
+    def refresh_list(self, names, **kwargs):
+        """Redraw the list after a background refresh, keeping the cursor"""
+        if self.is_closed:
+            return
+        index = self["list"].getCurrentIndex()
+        showlist(names, self["list"], **kwargs)
+        if names:
+            self["list"].setCurrentIndex(min(max(index, 0), len(names) - 1))
 
     def get_skin_path(self):
         """Determine skin path based on screen resolution"""
@@ -374,6 +417,12 @@ class WorldCamMainScreen(WebcamBaseScreen):
                 "icon": "top_webcams.png",
                 "screen": WorldCamTopScreen,
             },
+            {
+                "key": "search",
+                "name": _("Search"),
+                "icon": "Internat.png",
+                "screen": WorldCamSearchScreen,
+            },
             # {
             #     "key": "webcam_pl",
             #     "name": _("Webcam.pl"),
@@ -395,6 +444,11 @@ class WorldCamMainScreen(WebcamBaseScreen):
         self.timer = eTimer()
         self.timer.callback.append(self.check_update_silent)
         self.timer.start(500, 1)
+        start_crawler(self.lang)
+        # No crawling once the plugin is closed (e.g. while watching TV)
+        self.onClose.append(stop_crawler)
+        # Network timings of the session, see timings.TIMINGS_DIR
+        self.onClose.append(lambda: run_async(timing_stats.dump))
         self.onLayoutFinish.append(self.initialize)
         self.onLayoutFinish.append(self.set_flag_icon)
 
@@ -519,6 +573,7 @@ class WorldCamMainScreen(WebcamBaseScreen):
             self["language_label"].setText(self.get_english_name(self.lang))
             self.set_flag_icon()
             self.initialize()
+            self.prewarm_language()
 
             self.logger.info(f"Language changed to {new_lang}")
             self.show_message(
@@ -532,6 +587,15 @@ class WorldCamMainScreen(WebcamBaseScreen):
         finally:
             pass
 
+    def prewarm_language(self):
+        """Fill the caches for the new language before the user browses"""
+        def failed(failure):
+            self.logger.error(
+                "Pre-warming failed: %s" % failure.getErrorMessage())
+
+        SkylineScraper(self.lang).prewarm_async().addErrback(failed)
+        start_crawler(self.lang)
+
     def get_english_name(self, code):
         english_names = {
             "en": "English",
@@ -600,10 +664,14 @@ class WorldCamMainScreen(WebcamBaseScreen):
         remote_changelog = ""
 
         try:
-            req = Request(
+            response = get_session().request(
                 b64decoder(installer_url), headers={
-                    "User-Agent": AgentRequest})
-            page = urlopen(req).read().decode("utf-8")
+                    "User-Agent": AgentRequest}, policy="update")
+            if response.status >= 400:
+                response.close()
+                raise IOError(
+                    "HTTP {} {}".format(response.status, response.reason))
+            page = response.read().decode("utf-8")
         except Exception as e:
             if not silent:
                 self.defer_message(
@@ -820,7 +888,7 @@ class WorldCamLocalScreen(WebcamBaseScreen):
         super().__init__(session, lang)
         disable_summary(self)
         self.logger.info("Initializing WorldCamLocalScreen")
-        self.scraper = SkylineScraper(lang if lang else "en")
+        self.scraper = SkylineScraper(self.lang)
         self["title"] = Label(_("User Lists"))
         self["flag_icon"] = Pixmap()
         self["language_label"] = Label(self.lang.upper())
@@ -907,7 +975,7 @@ class WorldCamLocal(WebcamBaseScreen):
             "Initializing WorldCamLocal with category: %s" %
             playlists)
         self.category = playlists
-        self.scraper = SkylineScraper(lang if lang else "en")
+        self.scraper = SkylineScraper(self.lang)
         self["title"] = Label(splitext(playlists)[0])
         self["flag_icon"] = Pixmap()
         self["language_label"] = Label(self.lang.upper())
@@ -947,6 +1015,8 @@ class WorldCamLocal(WebcamBaseScreen):
                 showlist([w["name"] for w in self.webcams],
                          self["list"], is_category=True)
                 self["list"].setCurrentIndex(0)
+                # Playlist streams live on many hosts: resolve them all now
+                prefetch(w["url"] for w in self.webcams)
 
         except Exception as e:
             self.logger.error(f"Error loading playlist: {str(e)}")
@@ -981,7 +1051,7 @@ class WorldCamContinentScreen(WebcamBaseScreen):
         super().__init__(session, lang)
         disable_summary(self)
         self.logger.info("Initializing WorldCamContinentScreen")
-        self.scraper = SkylineScraper(lang if lang else "en")
+        self.scraper = SkylineScraper(self.lang)
         self["title"] = Label(_("Continents"))
         self["flag_icon"] = Pixmap()
         self["language_label"] = Label(self.lang.upper())
@@ -999,19 +1069,30 @@ class WorldCamContinentScreen(WebcamBaseScreen):
         self.onLayoutFinish.append(self.set_flag_icon)
 
     def load_continents(self):
-        """Load continents from scraper"""
-        try:
-            self.continents = self.scraper.get_continents()
-            continent_names = [continent["name"]
-                               for continent in self.continents]
-            self.logger.info(f"Loaded {len(continent_names)} continents")
-            if continent_names:
-                showlist(continent_names, self["list"], is_category=True)
-                self["list"].setCurrentIndex(0)
+        """Load continents from scraper without blocking the GUI"""
+        continents = get_catalog(self.scraper.lang).get_continents()
+        if continents:
+            self.show_continents(continents)
+            return
+        self.load_async(
+            self.scraper.get_continents_async(
+                on_update=self.on_continents_updated),
+            self.show_continents,
+            _("Error loading continents"))
+
+    def show_continents(self, continents):
+        self.continents = continents
+        continent_names = [continent["name"]
+                           for continent in self.continents]
+        self.logger.info(f"Loaded {len(continent_names)} continents")
+        if continent_names:
+            showlist(continent_names, self["list"], is_category=True)
+            self["list"].setCurrentIndex(0)
 
-        except Exception as e:
-            self.logger.error("Error loading continents: " + str(e))
-            self["title"].setText(_("Error loading continents"))
+    def on_continents_updated(self, continents):
+        """Continents changed after a background refresh"""
+        self.continents = continents
+        self.refresh_list([c["name"] for c in continents], is_category=True)
 
     def on_item_selected(self):
         """Handle continent selection"""
@@ -1089,7 +1170,7 @@ class WorldCamCountryScreen(WebcamBaseScreen):
         super().__init__(session, lang)
         disable_summary(self)
         self.logger.info("Initializing WorldCamCountryScreen")
-        self.scraper = SkylineScraper(lang if lang else "en")
+        self.scraper = SkylineScraper(self.lang)
         self["title"] = Label(_("Country"))
         self["flag_icon"] = Pixmap()
         self["language_label"] = Label(self.lang.upper())
@@ -1102,22 +1183,35 @@ class WorldCamCountryScreen(WebcamBaseScreen):
             "ok": self.on_item_selected,
             "cancel": self.close,
         })
+        self.countries = []
         self.onLayoutFinish.append(self.load_countries)
         self.onLayoutFinish.append(self.set_flag_icon)
 
     def load_countries(self):
-        """Load and sort countries from scraper, then show in list."""
-        try:
-            countries = self.scraper.get_countries()
-            self.countries = sorted(countries, key=lambda c: c["name"].lower())
-            country_names = [country["name"] for country in self.countries]
-            self.logger.info("Loaded and sorted countries: %s" % country_names)
-            if country_names:
-                showlist(country_names, self["list"])
-                self["list"].setCurrentIndex(0)
-        except Exception as e:
-            self.logger.error("Error loading countries: %s" % str(e))
-            self["title"].setText(_("Error loading countries"))
+        """Load countries from scraper without blocking the GUI"""
+        countries = get_catalog(self.scraper.lang).get_countries()
+        if countries:
+            self.show_countries(countries)
+            return
+        self.load_async(
+            self.scraper.get_countries_async(
+                on_update=self.on_countries_updated),
+            self.show_countries,
+            _("Error loading countries"))
+
+    def show_countries(self, countries):
+        """Sort countries and show them in the list."""
+        self.countries = sorted(countries, key=lambda c: c["name"].lower())
+        country_names = [country["name"] for country in self.countries]
+        self.logger.info("Loaded and sorted countries: %s" % country_names)
+        if country_names:
+            showlist(country_names, self["list"])
+            self["list"].setCurrentIndex(0)
+
+    def on_countries_updated(self, countries):
+        """Countries changed after a background refresh"""
+        self.countries = sorted(countries, key=lambda c: c["name"].lower())
+        self.refresh_list([c["name"] for c in self.countries])
 
     def on_item_selected(self):
         """Handle country selection and open corresponding location screen."""
@@ -1144,7 +1238,7 @@ class WorldCamCategoryScreen(WebcamBaseScreen):
         super().__init__(session, lang)
         disable_summary(self)
         self.logger.info("Initializing WorldCamCategoryScreen")
-        self.scraper = SkylineScraper(lang if lang else "en")
+        self.scraper = SkylineScraper(self.lang)
         self["title"] = Label(_("Categories"))
         self["flag_icon"] = Pixmap()
         self["language_label"] = Label(self.lang.upper())
@@ -1162,21 +1256,34 @@ class WorldCamCategoryScreen(WebcamBaseScreen):
         self.onLayoutFinish.append(self.set_flag_icon)
 
     def load_categories(self):
-        """Load categories from scraper and display them sorted."""
-        try:
-            categories = self.scraper.get_categories()
-            self.categories = sorted(
-                categories, key=lambda c: c["name"].lower())
-            category_names = [cat["name"] for cat in self.categories]
-            self.logger.info(
-                "Loaded and sorted categories: %s" %
-                category_names)
-            if category_names:
-                showlist(category_names, self["list"], is_country=True)
-                self["list"].setCurrentIndex(0)
-        except Exception as e:
-            self.logger.error("Error loading categories: %s" % str(e))
-            self["title"].setText(_("Error loading categories"))
+        """Load categories from scraper without blocking the GUI"""
+        categories = get_catalog(self.scraper.lang).get_categories()
+        if categories:
+            self.show_categories(categories)
+            return
+        self.load_async(
+            self.scraper.get_categories_async(
+                on_update=self.on_categories_updated),
+            self.show_categories,
+            _("Error loading categories"))
+
+    def show_categories(self, categories):
+        """Display categories sorted by name."""
+        self.categories = sorted(
+            categories, key=lambda c: c["name"].lower())
+        category_names = [cat["name"] for cat in self.categories]
+        self.logger.info(
+            "Loaded and sorted categories: %s" %
+            category_names)
+        if category_names:
+            showlist(category_names, self["list"], is_country=True)
+            self["list"].setCurrentIndex(0)
+
+    def on_categories_updated(self, categories):
+        """Categories changed after a background refresh"""
+        self.categories = sorted(categories, key=lambda c: c["name"].lower())
+        self.refresh_list(
+            [c["name"] for c in self.categories], is_country=True)
 
     def on_item_selected(self):
         """Handle user selecting a category."""
@@ -1204,7 +1311,7 @@ class WorldCamTopScreen(WebcamBaseScreen):
         super().__init__(session, lang)
         disable_summary(self)
         self.logger.info("Initializing WorldCamTopScreen")
-        self.scraper = SkylineScraper(lang if lang else "en")
+        self.scraper = SkylineScraper(self.lang)
         self["title"] = Label(_("Top Webcams"))
         self["flag_icon"] = Pixmap()
         self["language_label"] = Label(self.lang.upper())
@@ -1223,25 +1330,41 @@ class WorldCamTopScreen(WebcamBaseScreen):
 
     def load_top_webcams(self):
         """
-        Load the list of top webcams, sort them by name and display in the list.
+        Load the list of top webcams without blocking the GUI.
         """
-        try:
-            top_webcams = self.scraper.get_top_webcams()
-            self.top_webcams = sorted(
-                top_webcams, key=lambda c: c["name"].lower())
-            webcam_names = [
-                w["name"] for w in self.top_webcams
-                if w["name"].strip().lower() != "top live cams"
-            ]
-            self.logger.info(
-                "Loaded and sorted top webcams: %s" %
-                webcam_names)
-            if webcam_names:
-                showlist(webcam_names, self["list"], is_country=True)
-                self["list"].setCurrentIndex(0)
-        except Exception as e:
-            self.logger.error("Error loading top webcams: %s" % str(e))
-            self["title"].setText(_("Error loading top webcams"))
+        self.load_async(
+            self.scraper.get_top_webcams_async(
+                on_progress=self.on_top_webcams_progress),
+            self.show_top_webcams,
+            _("Error loading top webcams"))
+
+    def sort_top_webcams(self, top_webcams):
+        """Sorted by name, without the page's own "Top Live Cams" entry"""
+        self.top_webcams = sorted(
+            (w for w in top_webcams
+             if w["name"].strip().lower() != "top live cams"),
+            key=lambda c: c["name"].lower())
+        return [w["name"] for w in self.top_webcams]
+
+    def on_top_webcams_progress(self, top_webcams):
+        """Show the pages loaded so far while the others download"""
+        self.refresh_list(
+            self.sort_top_webcams(top_webcams), is_country=True)
+
+    def show_top_webcams(self, top_webcams):
+        """
+        Sort top webcams by name and display them in the list.
+        """
+        if self.top_webcams:
+            self.on_top_webcams_progress(top_webcams)
+            return
+        webcam_names = self.sort_top_webcams(top_webcams)
+        self.logger.info(
+            "Loaded and sorted top webcams: %s" %
+            webcam_names)
+        if webcam_names:
+            showlist(webcam_names, self["list"], is_country=True)
+            self["list"].setCurrentIndex(0)
 
     def on_item_selected(self):
         """
@@ -1267,6 +1390,122 @@ class WorldCamTopScreen(WebcamBaseScreen):
         )
 
 
+class WorldCamSearchScreen(WebcamBaseScreen):
+    """
+    Search webcams by name, description, location or country in the
+    locally crawled catalog; results update as you type.
+    """
+
+    def __init__(self, session, lang=None):
+        super().__init__(session, lang)
+        disable_summary(self)
+        self.logger.info("Initializing WorldCamSearchScreen")
+        self.scraper = SkylineScraper(self.lang)
+        self["title"] = Label(_("Search"))
+        self["flag_icon"] = Pixmap()
+        self["language_label"] = Label(self.lang.upper())
+        self["paypal"] = Label(paypal())
+        self["key_red"] = Button(_("Exit"))
+        self["key_green"] = Button(_("Play"))
+        self["key_yellow"] = Button(_("Delete"))
+        self["key_blue"] = Button(_("Keyboard"))
+        actions = {
+            "ok": self.on_item_selected,
+            "cancel": self.close,
+            "red": self.close,
+            "green": self.on_item_selected,
+            "yellow": self.delete_char,
+            "backspace": self.delete_char,
+            "blue": self.open_keyboard,
+            "text": self.open_keyboard,
+        }
+        for number in range(10):
+            actions[str(number)] = lambda n=number: self.key_number(n)
+        self["actions"] = HelpableActionMap(self, "WorldCamActions", actions)
+        self.numerical = NumericalTextInput(nextFunc=self.commit_char)
+        self.query = ""
+        self.pending_char = ""
+        self.index = None
+        self.results = []
+        self.onLayoutFinish.append(self.load_index)
+        self.onLayoutFinish.append(self.set_flag_icon)
+
+    def load_index(self):
+        """Build (or reuse) the search index without blocking the GUI"""
+        catalog = get_catalog(self.scraper.lang)
+        self.load_async(
+            run_async(get_index, catalog),
+            self.index_ready,
+            _("Error loading search index"))
+
+    def index_ready(self, index):
+        self.index = index
+        self.logger.info("Search index ready: %d webcams" % len(index))
+        if not len(index):
+            self["title"].setText(
+                _("Catalog not downloaded yet, try again later"))
+            return
+        self.update_results()
+
+    def key_number(self, number):
+        self.pending_char = self.numerical.getKey(number)
+        self.update_results()
+
+    def commit_char(self):
+        self.query += self.pending_char
+        self.pending_char = ""
+
+    def delete_char(self):
+        if self.pending_char:
+            self.numerical.nextKey()
+            self.pending_char = ""
+        else:
+            self.query = self.query[:-1]
+        self.update_results()
+
+    def open_keyboard(self):
+        self.numerical.nextKey()
+        self.commit_char()
+        self.session.openWithCallback(
+            self.keyboard_closed,
+            VirtualKeyBoard,
+            title=_("Search webcams"),
+            text=self.query)
+
+    def keyboard_closed(self, text=None):
+        if text is not None:
+            self.query = text
+            self.update_results()
+
+    def update_results(self):
+        query = self.query + self.pending_char
+        self["title"].setText(_("Search: %s_") % query)
+        if self.index is None:
+            return
+        self.results = self.index.search(query)
+        names = []
+        for webcam in self.results:
+            place = webcam.get("location") or webcam.get("country")
+            if place:
+                names.append("%s - %s" % (webcam["name"], place))
+            else:
+                names.append(webcam["name"])
+        showlist(names, self["list"], is_country=True)
+        if names:
+            self["list"].setCurrentIndex(0)
+
+    def on_item_selected(self):
+        """Play the selected result, with the others as playlist"""
+        index = self["list"].getCurrentIndex()
+        if index is None or index < 0 or index >= len(self.results):
+            return
+        self.session.open(
+            WorldCamPlayer,
+            webcams=self.results,
+            current_index=index
+        )
+
+
 class WorldCamLocationScreen(WebcamBaseScreen):
     """
     Screen to display and select locations within a country.
@@ -1277,7 +1516,8 @@ class WorldCamLocationScreen(WebcamBaseScreen):
         disable_summary(self)
         self.logger.info("Initializing WorldCamLocationScreen")
         self.country = country
-        self.scraper = SkylineScraper(lang if lang else "en")
+        self.scraper = SkylineScraper(self.lang)
+        note_country(country["url"])
         self["title"] = Label(country["name"])
         self["flag_icon"] = Pixmap()
         self["language_label"] = Label(self.lang.upper())
@@ -1296,23 +1536,45 @@ class WorldCamLocationScreen(WebcamBaseScreen):
 
     def load_locations(self):
         """
-        Load and display the list of locations for the current country.
+        Load the list of locations for the current country without
+        blocking the GUI.
         """
-        try:
-            self.locations = self.scraper.get_locations(self.country["url"])
-            location_names = sorted(
-                [loc["name"] for loc in self.locations], key=lambda s: s.lower())
-            self.logger.info(
-                "Loaded locations for country %s: %s" %
-                (self.country["name"], location_names))
-            if location_names:
-                showlist(location_names, self["list"], is_category=True)
-                self["list"].setCurrentIndex(0)
-        except Exception as e:
-            self.logger.error(
-                "Error loading locations for country %s: %s" %
-                (self.country["name"], str(e)))
-            self["title"].setText(_("Error loading locations"))
+        locations = get_catalog(self.scraper.lang).get_locations(
+            self.country["url"])
+        if locations:
+            self.show_locations(locations)
+            return
+        self.load_async(
+            self.scraper.get_locations_async(
+                self.country["url"],
+                on_update=self.on_locations_updated,
+                on_progress=self.on_locations_updated),
+            self.show_locations,
+            _("Error loading locations"))
+
+    def show_locations(self, locations):
+        """
+        Display the list of locations for the current country.
+        """
+        if self.locations:
+            # First rows were already shown while the page loaded
+            self.on_locations_updated(locations)
+            return
+        self.locations = sorted(
+            locations, key=lambda loc: loc["name"].lower())
+        location_names = [loc["name"] for loc in self.locations]
+        self.logger.info(
+            "Loaded locations for country %s: %s" %
+            (self.country["name"], location_names))
+        if location_names:
+            showlist(location_names, self["list"], is_category=True)
+            self["list"].setCurrentIndex(0)
+
+    def on_locations_updated(self, locations):
+        """Locations changed after a background refresh or load progress"""
+        self.locations = sorted(locations, key=lambda loc: loc["name"].lower())
+        self.refresh_list(
+            [loc["name"] for loc in self.locations], is_category=True)
 
     def on_item_selected(self):
         """
@@ -1353,7 +1615,7 @@ class WorldCamWebcamScreen(WebcamBaseScreen):
         self.logger.info("Initializing WorldCamWebcamScreen")
         disable_summary(self)
         self.location = location
-        self.scraper = SkylineScraper(lang if lang else "en")
+        self.scraper = SkylineScraper(self.lang)
         self["title"] = Label(location["name"])
         self["flag_icon"] = Pixmap()
         self["language_label"] = Label(self.lang.upper())
@@ -1472,23 +1734,41 @@ class WorldCamWebcamScreen(WebcamBaseScreen):
 
     def load_webcams(self):
         """
-        Load and display the list of webcams for the current location.
+        Load the list of webcams for the current location without
+        blocking the GUI.
         """
-        try:
-            webcams = self.scraper.get_webcams(self.location["url"])
-            self.webcams = sorted(webcams, key=lambda w: w["name"].lower())
-            webcam_names = [webcam["name"] for webcam in self.webcams]
-            self.logger.info(
-                "Loaded webcams for location %s: %s" %
-                (self.location["name"], webcam_names))
-            if webcam_names:
-                showlist(webcam_names, self["list"], is_category=True)
-                self["list"].setCurrentIndex(0)
-        except Exception as e:
-            self.logger.error(
-                "Error loading webcams for location %s: %s" %
-                (self.location["name"], str(e)))
-            self["title"].setText(_("Error loading webcams"))
+        webcams = get_catalog(self.scraper.lang).get_webcams(
+            self.location["url"])
+        if webcams:
+            self.show_webcams(webcams)
+            return
+        self.load_async(
+            self.scraper.get_webcams_async(
+                self.location["url"], on_progress=self.on_webcams_progress),
+            self.show_webcams,
+            _("Error loading webcams"))
+
+    def on_webcams_progress(self, webcams):
+        """Show the webcams found so far while the page downloads"""
+        self.webcams = sorted(webcams, key=lambda w: w["name"].lower())
+        self.refresh_list(
+            [webcam["name"] for webcam in self.webcams], is_category=True)
+
+    def show_webcams(self, webcams):
+        """
+        Display the list of webcams for the current location.
+        """
+        if self.webcams:
+            self.on_webcams_progress(webcams)
+            return
+        self.webcams = sorted(webcams, key=lambda w: w["name"].lower())
+        webcam_names = [webcam["name"] for webcam in self.webcams]
+        self.logger.info(
+            "Loaded webcams for location %s: %s" %
+            (self.location["name"], webcam_names))
+        if webcam_names:
+            showlist(webcam_names, self["list"], is_category=True)
+            self["list"].setCurrentIndex(0)
 
     def on_item_selected(self):
         """
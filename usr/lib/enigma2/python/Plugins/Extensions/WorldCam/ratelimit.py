@@ -0,0 +1,292 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from email.utils import mktime_tz, parsedate_tz
+from http.client import BadStatusLine
+from random import uniform
+from socket import timeout as SocketTimeout
+from threading import Lock
+from time import monotonic, sleep, time
+from urllib.parse import urlsplit
+
+from twisted.python.threadable import isInIOThread
+
+from .utils import Logger
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Rate Limiter for Plugin                     #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+# Limits per subsystem, applied per host:
+#   rate/burst   token bucket (requests per second, requests saved up)
+#   retries      extra attempts after a transient failure
+#   backoff      first retry delay, doubled each attempt up to max_backoff
+#   max_wait     longest Retry-After / host hold honoured (seconds);
+#                beyond it the failure is returned to the caller
+#   errors       transport errors retried (idempotent requests only)
+
+# Transport errors retried for idempotent requests
+RETRY_ERRORS = (ConnectionError, BadStatusLine, SocketTimeout)
+
+# Same without timeouts: a dead host would cost the full request
+# timeout on every attempt while the user waits
+FAST_RETRY_ERRORS = (ConnectionError, BadStatusLine)
+
+POLICIES = {
+    # Screens: the user is waiting, fail fast
+    "browse": dict(rate=4.0, burst=8, retries=2, backoff=0.5,
+                   max_backoff=4, max_wait=10, errors=FAST_RETRY_ERRORS),
+    # Stream resolvers in client.request
+    "client": dict(rate=2.0, burst=4, retries=2, backoff=0.5,
+                   max_backoff=4, max_wait=10, errors=FAST_RETRY_ERRORS),
+    # Background catalog crawl: slow and patient
+    "crawler": dict(rate=1 / 1.5, burst=1, retries=4, backoff=5,
+                    max_backoff=120, max_wait=900),
+    # Plugin update check
+    "update": dict(rate=1.0, burst=2, retries=1, backoff=1,
+                   max_backoff=5, max_wait=10, errors=FAST_RETRY_ERRORS),
+    # Google Translate (translate_utils): falls back to the original text
+    "translate": dict(rate=2.0, burst=4, retries=1, backoff=0.5,
+                      max_backoff=2, max_wait=5, errors=FAST_RETRY_ERRORS),
+}
+
+# Statuses worth retrying: the server is overloaded or throttling us
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Methods that are safe to resend after a transport error
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_holds = {}
+_holds_lock = Lock()
+
+
+class HostHeldError(OSError):
+    """
+    Raised instead of contacting a host that asked to be left alone
+    (429/503 with Retry-After) for longer than the policy's max_wait.
+    """
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, mktime_tz(parsedate_tz(value)) - time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def hold_host(host, seconds):
+    """Ask every subsystem to leave host alone for the next seconds."""
+    until = time() + seconds
+    with _holds_lock:
+        if _holds.get(host, 0) < until:
+            _holds[host] = until
+
+
+def host_hold(host):
+    """Seconds left before host may be contacted again."""
+    with _holds_lock:
+        until = _holds.get(host)
+        if until is None:
+            return 0.0
+        left = until - time()
+        if left <= 0:
+            del _holds[host]
+            return 0.0
+        return left
+
+
+class TokenBucket:
+    """rate tokens per second, at most burst of them saved up."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = monotonic()
+        self._lock = Lock()
+
+    def reserve(self):
+        """Take a token and return how long to wait before using it."""
+        with self._lock:
+            now = monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            # Callers queue up: each one owes the tokens taken before it
+            return -self.tokens / self.rate
+
+
+class RetryPolicy:
+    """Rate limit and retry settings of one subsystem (see POLICIES)."""
+
+    def __init__(self, name, rate, burst, retries, backoff, max_backoff,
+                 max_wait, statuses=RETRY_STATUSES, errors=RETRY_ERRORS):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self.statuses = statuses
+        self.errors = errors
+        self._buckets = {}
+        self._lock = Lock()
+        self.requests = 0
+        self.retried = 0
+        self.gave_up = 0
+        self.waited = 0.0
+
+    def bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(
+                    self.rate, self.burst)
+            return bucket
+
+    def wait_turn(self, host, blocking=True):
+        """
+        Take a token for host, sleeping until it may be used. Raises
+        HostHeldError if host is held for longer than max_wait.
+        """
+        hold = host_hold(host)
+        if hold > self.max_wait:
+            raise HostHeldError(
+                "%s asked to wait %ds, more than %ds" % (
+                    host, hold, self.max_wait))
+        delay = max(self.bucket(host).reserve(), hold)
+        with self._lock:
+            self.requests += 1
+            if blocking:
+                self.waited += delay
+        if blocking and delay > 0:
+            sleep(delay)
+
+    def retry_delay(self, attempt, retry_after=None):
+        """Delay before retry attempt+1, or None to give up."""
+        if attempt >= self.retries:
+            return None
+        if retry_after is not None and retry_after > self.max_wait:
+            return None
+        # Capped exponential backoff with jitter on its upper half
+        ceiling = min(self.max_backoff, self.backoff * 2 ** attempt)
+        delay = uniform(ceiling / 2, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def count(self, name):
+        """Add one to the retried / gave_up counter (any thread)."""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hosts": len(self._buckets),
+                "requests": self.requests,
+                "retried": self.retried,
+                "gave_up": self.gave_up,
+                "waited": round(self.waited, 2),
+            }
+
+
+_policies = {}
+_policies_lock = Lock()
+
+
+def get_policy(name):
+    """Return the RetryPolicy of a subsystem (name or policy instance)."""
+    if isinstance(name, RetryPolicy):
+        return name
+    with _policies_lock:
+        policy = _policies.get(name)
+        if policy is None:
+            policy = _policies[name] = RetryPolicy(name, **POLICIES[name])
+        return policy
+
+
+def get_stats():
+    with _policies_lock:
+        policies = list(_policies.values())
+    return dict((policy.name, policy.stats()) for policy in policies)
+
+
+def call_with_retry(policy, url, send, method="GET"):
+    """
+    Call send() under the policy's rate limit and retry it on transient
+    failures. send() returns a response with getcode()/headers/close()
+    (an HTTPError is fine) or raises. A host held for longer than the
+    policy's max_wait is not contacted (HostHeldError).
+
+    On the reactor thread nothing sleeps: the token is taken but the
+    request is neither delayed nor retried.
+    """
+    policy = get_policy(policy)
+    host = urlsplit(url).hostname or ""
+    blocking = not isInIOThread()
+    attempt = 0
+    while True:
+        try:
+            policy.wait_turn(host, blocking)
+        except HostHeldError:
+            policy.count("gave_up")
+            raise
+        try:
+            response = send()
+        except RETRY_ERRORS as e:
+            delay = None
+            if (blocking and isinstance(e, policy.errors) and
+                    method.upper() in IDEMPOTENT_METHODS):
+                delay = policy.retry_delay(attempt)
+            if delay is None:
+                policy.count("gave_up")
+                raise
+            Logger().warning(
+                "%s: %s, retry %d in %.1fs" % (url, e, attempt + 1, delay))
+        else:
+            status = response.getcode()
+            if status not in policy.statuses:
+                return response
+            retry_after = parse_retry_after(
+                response.headers.get("Retry-After"))
+            delay = policy.retry_delay(attempt, retry_after)
+            if status in (429, 503):
+                # Throttled or overloaded: the other subsystems back off too
+                hold_host(host, retry_after if retry_after is not None
+                          else delay or policy.backoff)
+            if delay is None or not blocking:
+                policy.count("gave_up")
+                return response
+            response.close()
+            Logger().warning(
+                "%s: HTTP %d, retry %d in %.1fs" %
+                (url, status, attempt + 1, delay))
+        policy.count("retried")
+        attempt += 1
+        sleep(delay)
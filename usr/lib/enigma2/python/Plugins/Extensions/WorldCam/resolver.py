@@ -0,0 +1,253 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import socket
+from http.client import HTTPConnection, HTTPSConnection
+from threading import Lock
+from time import perf_counter, time
+from urllib.parse import urlsplit
+from urllib.request import HTTPHandler, HTTPSHandler
+
+from twisted.internet import reactor
+from twisted.internet.defer import DeferredList
+from twisted.internet.threads import deferToThreadPool
+
+from .timings import add_phase, current
+from .workers import SingleFlight, get_pool
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam DNS Cache for Plugin                        #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+# getaddrinfo() does not expose the record TTL: resolved hosts are kept
+# this long (seconds)
+DNS_TTL = 300
+
+# Failed lookups are remembered this long, so a dead host in a playlist
+# does not hit the slow resolver on every request (seconds)
+DNS_NEGATIVE_TTL = 30
+
+DNS_CACHE_SIZE = 512
+
+# Parallel lookups when a playlist is prefetched
+DNS_PREFETCH_WORKERS = 8
+
+
+def _is_address(host):
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, host)
+            return True
+        except (OSError, ValueError):
+            pass
+    return False
+
+
+class DNSCache:
+    """
+    Thread-safe cache of getaddrinfo() results per host name, shared by
+    every connection of the plugin. Entries are resolved without a
+    port, so one lookup serves all ports and schemes of a host.
+    """
+
+    def __init__(self, ttl=DNS_TTL, negative_ttl=DNS_NEGATIVE_TTL,
+                 maxsize=DNS_CACHE_SIZE):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self._entries = {}  # host -> (expires, addrinfo list or error)
+        self._lock = Lock()
+        self._lookups = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+    def resolve(self, host):
+        """
+        Return the addrinfo list of host (port 0), from the cache when
+        possible. Raises socket.gaierror, cached failures included.
+        """
+        now = time()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry[0] > now:
+                result = entry[1]
+                if isinstance(result, socket.gaierror):
+                    self.negative_hits += 1
+                    raise socket.gaierror(*result.args)
+                self.hits += 1
+                return result
+            self.misses += 1
+        return self._lookups.do(host, self._lookup, host)
+
+    def _lookup(self, host):
+        try:
+            result = socket.getaddrinfo(host, 0, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            self._store(host, e, self.negative_ttl)
+            raise
+        self._store(host, result, self.ttl)
+        return result
+
+    def _store(self, host, result, ttl):
+        now = time()
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                for key in [key for key, entry in self._entries.items()
+                            if entry[0] <= now]:
+                    del self._entries[key]
+                if len(self._entries) >= self.maxsize:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[host] = (now + ttl, result)
+
+    def is_cached(self, host):
+        with self._lock:
+            entry = self._entries.get(host)
+            return entry is not None and entry[0] > time()
+
+    def forget(self, host):
+        """Drop host, e.g. after none of its addresses accepted a connection."""
+        with self._lock:
+            self._entries.pop(host, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "negative_hits": self.negative_hits,
+            }
+
+
+dns_cache = DNSCache()
+
+
+def create_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
+                      source_address=None):
+    """
+    socket.create_connection() resolving through dns_cache; DNS and
+    connect times go to the request timed on this thread.
+    """
+    host, port = address
+    started = perf_counter()
+    if _is_address(host):
+        try:
+            return socket.create_connection(address, timeout, source_address)
+        finally:
+            add_phase("connect", perf_counter() - started)
+
+    try:
+        addresses = dns_cache.resolve(host)
+    finally:
+        add_phase("dns", perf_counter() - started)
+
+    error = None
+    for family, socktype, proto, _name, sockaddr in addresses:
+        sockaddr = (sockaddr[0], port) + tuple(sockaddr[2:])
+        sock = None
+        started = perf_counter()
+        try:
+            sock = socket.socket(family, socktype, proto)
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            error = e
+            if sock is not None:
+                sock.close()
+        finally:
+            add_phase("connect", perf_counter() - started)
+    # The host may have moved: resolve it again next time
+    dns_cache.forget(host)
+    if error is not None:
+        raise error
+    raise OSError("getaddrinfo returns an empty list")
+
+
+class CachedHTTPConnection(HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        HTTPConnection.__init__(self, *args, **kwargs)
+        self._create_connection = create_connection
+
+
+class CachedHTTPSConnection(HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        HTTPSConnection.__init__(self, *args, **kwargs)
+        self._create_connection = create_connection
+
+    def connect(self):
+        # Whatever connect() spends beyond DNS + TCP is the TLS handshake
+        timing = current()
+        before = timing.connecting() if timing is not None else 0.0
+        started = perf_counter()
+        try:
+            HTTPSConnection.connect(self)
+        finally:
+            if timing is not None:
+                timing.add("tls", perf_counter() - started -
+                           (timing.connecting() - before))
+
+
+class CachedHTTPHandler(HTTPHandler):
+    """urllib handler whose connections resolve through dns_cache."""
+
+    def http_open(self, req):
+        return self.do_open(CachedHTTPConnection, req)
+
+
+class CachedHTTPSHandler(HTTPSHandler):
+    """urllib handler whose connections resolve through dns_cache."""
+
+    def https_open(self, req):
+        return self.do_open(CachedHTTPSConnection, req, context=self._context)
+
+
+def _warm(host):
+    try:
+        dns_cache.resolve(host)
+    except (OSError, UnicodeError):
+        pass  # remembered as a negative entry
+
+
+def prefetch(urls):
+    """
+    Resolve the hosts of urls in parallel in the background, e.g. when
+    a playlist is opened. Call from the main thread; returns a
+    DeferredList that fires once every lookup ended.
+    """
+    hosts = set()
+    for url in urls:
+        try:
+            host = urlsplit(url).hostname
+        except (AttributeError, ValueError):
+            continue
+        if host and not _is_address(host) and not dns_cache.is_cached(host):
+            hosts.add(host)
+
+    pool = get_pool("WorldCamDNS", DNS_PREFETCH_WORKERS)
+    return DeferredList(
+        [deferToThreadPool(reactor, pool, _warm, host) for host in hosts],
+        consumeErrors=True)
@@ -1,19 +1,44 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from enigma import eTimer
-from re import search, escape, findall, DOTALL, IGNORECASE  # , sub
+from codecs import getincrementaldecoder
+from re import escape, findall, IGNORECASE  # , sub
 from os import listdir
+from threading import Lock
+from time import perf_counter, time
 from os.path import (
     exists,
     isfile,
     join,
 )
 
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
 
+from .cache import (
+    cache_key,
+    disk_cache,
+    page_cache,
+    parsed_cache,
+    parsed_key,
+)
+from .breaker import get_stats as get_breaker_stats, is_open
+from .network import get_session, transfer_stats
+from .ratelimit import get_stats as get_rate_limit_stats
+from .resolver import dns_cache
+from .timings import timing_stats
+from .parsers import (
+    LOCATION_PATTERN,
+    PARSER_VERSION,
+    HomepageModel,
+    LocationExtractor,
+    MarkerScanner,
+    WebcamExtractor,
+    location_name_from_url,
+    parse_grid,
+    parse_homepage,
+    scan_grid,
+)
 from .utils import Logger
+from .workers import SingleFlight, call_in_main, run_async, run_parallel
 
 
 """
@@ -40,6 +65,24 @@ __author__ = "Lululla"
 
 BASE_URL = "https://www.skylinewebcams.com"
 
+# URLs currently being revalidated in the background
+_refreshing = set()
+_refresh_lock = Lock()
+
+# Identical URLs downloaded at the same time share one request
+_inflight = SingleFlight()
+
+# Top webcams pages downloaded at the same time
+TOP_PAGE_WORKERS = 3
+
+# Country page the user opened last, pre-warmed on a language change
+_last_country_url = None
+
+
+def note_country(url):
+    global _last_country_url
+    _last_country_url = url
+
 """
 
 1. **WorldCamContinentScreen**
@@ -82,24 +125,48 @@ class SkylineScraper:
     BASE_URL = "https://www.skylinewebcams.com"
     HEADERS = {"User-Agent": "Mozilla/5.0",
                "Accept-Language": "en-US,en;q=0.5"}
+    # Cache lifetimes (seconds): the homepage rarely changes
+    HOME_TTL = 6 * 3600
+    PAGE_TTL = 3600
+    # Pages are read (and parsed progressively) in chunks of this size
+    CHUNK_SIZE = 16 * 1024
+    # Rate limit / retry policy of the requests (see ratelimit.POLICIES)
+    policy = "browse"
+    # Downloads coalesced with this scraper's; callers with another
+    # policy use their own so the screens never wait on their retries
+    flights = _inflight
 
     def __init__(self, lang="en"):
         """
-        Initialize scraper with language and setup cache and timer.
+        Initialize scraper with language and the shared page cache.
         """
         self.logger = Logger()
         self.logger.info("Entering __init__")
         self.lang = lang
-        self.cache = {}
-
-        self.timer = eTimer()
-        self.timer.callback.append(self.clear_cache)
-        self.timer.start(3600000)  # Clear cache every hour (3600000 ms)
+        # Shared by all instances, entries expire on their own TTL
+        self.cache = page_cache
+        self.parsed_cache = parsed_cache
+        self.disk_cache = disk_cache
 
     def clear_cache(self):
-        """Clear the internal content cache."""
+        """Clear the shared content and parse result caches."""
         self.logger.info("Entering clear_cache")
-        self.cache = {}
+        self.cache.clear()
+        self.parsed_cache.clear()
+
+    def get_stats(self):
+        """Counters of the shared caches, transfers, coalesced fetches,
+        rate limiting, circuit breakers, DNS lookups and timings."""
+        return {
+            "page_cache": self.cache.stats(),
+            "parsed_cache": self.parsed_cache.stats(),
+            "transfer": transfer_stats.stats(),
+            "coalescing": _inflight.stats(),
+            "rate_limit": get_rate_limit_stats(),
+            "circuits": get_breaker_stats(),
+            "dns": dns_cache.stats(),
+            "timings": timing_stats.snapshot(),
+        }
 
     def get_full_url(self, path):
         """
@@ -121,6 +188,25 @@ class SkylineScraper:
         # Handle relative paths
         return self.BASE_URL + "/" + path
 
+    def accept_language(self):
+        """Accept-Language header value for the scraper language."""
+        if self.lang == "en":
+            return self.HEADERS["Accept-Language"]
+        return "%s,en;q=0.5" % self.lang
+
+    def localize_url(self, url):
+        """The same site page in the scraper language: /it/... -> /de/..."""
+        if not url or not url.startswith(self.BASE_URL + "/"):
+            return url
+        path = url[len(self.BASE_URL) + 1:]
+        for sep in ("/", "."):
+            head, found, tail = path.partition(sep)
+            if found and len(head) == 2 and head.isalpha():
+                return self.BASE_URL + "/" + self.lang + sep + tail
+        if len(path) == 2 and path.isalpha():
+            return self.BASE_URL + "/" + self.lang
+        return url
+
     def is_direct_stream(self, url):
         """Check if URL is a direct video stream"""
         video_extensions = [
@@ -161,49 +247,11 @@ class SkylineScraper:
                 self.logger.info("Detected explore.org direct stream URL")
                 return webcam_page_url
 
-            # Otherwise proceed with the analysis of the SkylineWebcams page
-            content = self.fetch(webcam_page_url, use_cache=False)
-            if not content:
-                self.logger.warning(
-                    "No content fetched for URL: " +
-                    webcam_page_url)
-                return None
-
-            # Pattern 1: Standard HLS stream
-            hls_match = search(r"source:\s*'livee\.m3u8\?a=([^']+)'", content)
-            if hls_match:
-                video_id = hls_match.group(1)
-                self.logger.info(
-                    "Found HLS livee.m3u8 stream with video ID: " + video_id)
-                return "https://hd-auth.skylinewebcams.com/live.m3u8?a=" + video_id
-
-            # Pattern 2: YouTube video ID
-            yt_match = search(r"videoId:\s*'([^']+)'", content)
-            if yt_match:
-                video_id = yt_match.group(1)
-                stream_url = "https://www.youtube.com/watch?v=" + video_id
-                self.logger.info(f"Returning YouTube URL: {stream_url}")
-                return stream_url
-
-            # Pattern 3: JW Player file URL
-            jw_match = search(
-                r'player\.setup\({.*?file:\s*"([^"]+)"', content, DOTALL)
-            if jw_match:
-                self.logger.info("Found JW Player file URL")
-                return jw_match.group(1)
-
-            # Pattern 4: New HLS format
-            hls_match2 = search(r"hls:\s*'([^']+)'", content)
-            if hls_match2:
-                self.logger.info("Found new HLS format URL")
-                return hls_match2.group(1)
-
-            # Pattern 5: Direct video source from <video> tag
-            video_match = search(r'<video[^>]+src="([^"]+)"', content)
-            if video_match:
-                url = self.get_full_url(video_match.group(1))
-                self.logger.info("Found direct video source: " + url)
-                return url
+            # Otherwise scan the SkylineWebcams page, stopping the
+            # download at the first stream marker
+            found = self.scan_page(webcam_page_url, MarkerScanner())
+            if found:
+                return self._stream_url_from_marker(*found)
 
             self.logger.warning(
                 "No stream URL found in the page: " +
@@ -214,54 +262,382 @@ class SkylineScraper:
                     webcam_page_url, str(e)))
         return None
 
-    def fetch(self, url, use_cache=True):
+    def _stream_url_from_marker(self, name, match):
+        """Stream URL for a match of parsers.MarkerScanner."""
+        if name == "hls":
+            video_id = match.group(1)
+            self.logger.info(
+                "Found HLS livee.m3u8 stream with video ID: " + video_id)
+            return "https://hd-auth.skylinewebcams.com/live.m3u8?a=" + video_id
+        if name == "youtube":
+            stream_url = "https://www.youtube.com/watch?v=" + match.group(1)
+            self.logger.info(f"Returning YouTube URL: {stream_url}")
+            return stream_url
+        if name == "jwplayer":
+            self.logger.info("Found JW Player file URL")
+            return match.group(1)
+        if name == "hls_url":
+            self.logger.info("Found new HLS format URL")
+            return match.group(1)
+        # Direct video source from <video> tag
+        url = self.get_full_url(match.group(1))
+        self.logger.info("Found direct video source: " + url)
+        return url
+
+    def fetch(self, url, use_cache=True, ttl=None, on_refresh=None,
+              on_chunk=None, parse=None):
         """
-        Fetch the content of the URL with enhanced encoding handling
+        Fetch the content of the URL with enhanced encoding handling.
+
+        Looks in the shared memory cache first, then in the disk cache;
+        stale disk entries are revalidated with If-None-Match /
+        If-Modified-Since so an unchanged page costs a 304 only.
+
+        With on_refresh (stale-while-revalidate), an expired copy is
+        returned immediately and refreshed in the background;
+        on_refresh(content) is then called on the main thread if the
+        page changed. With parse, the refreshed page is parsed in the
+        worker and on_refresh gets parse(content) instead.
+
+        on_chunk(text) receives the decoded page piece by piece while
+        it downloads (not called when the page comes from a cache).
         """
         self.logger.info("Entering fetch for URL: " + str(url))
 
         safe_url = str(url)
-
-        if use_cache and safe_url in self.cache:
-            self.logger.info("Using cached content for: " + safe_url)
-            return self.cache[safe_url]
+        key = cache_key(safe_url, self.lang)
+        ttl = ttl or self.PAGE_TTL
+        cached = stored = None
+
+        if use_cache:
+            cached, fresh = self.cache.peek(key)
+            if fresh:
+                self.logger.info("Using cached content for: " + safe_url)
+                return cached
+
+            stored = self.disk_cache.get(key)
+            if stored and stored["stored"] + ttl > time():
+                self.logger.info("Using disk cached content for: " + safe_url)
+                self.cache.set(key, stored["body"], ttl=ttl)
+                return stored["body"]
+
+        stale = cached or (stored and stored["body"])
+        if stale and is_open(safe_url):
+            self.logger.info("Host is down, using cached content for: " +
+                             safe_url)
+            return stale
+
+        if on_refresh and stale:
+            self.logger.info("Serving stale content for: " + safe_url)
+            self._refresh_in_background(
+                safe_url, ttl, stale, on_refresh, parse)
+            return stale
+
+        content = self.flights.do(
+            key, self._download, safe_url, ttl, stored, use_cache,
+            on_chunk)
+        if content is None:
+            if stale:
+                self.logger.warning("Serving stale cache for: " + safe_url)
+                return stale
+            return ""
+        return content
+
+    def _download(self, safe_url, ttl, stored=None, use_cache=True,
+                  on_chunk=None):
+        """
+        Download safe_url (conditionally if a stored entry is given) and
+        update both caches. Returns the decoded page or None on failure.
+        """
+        key = cache_key(safe_url, self.lang)
+        headers = dict(self.HEADERS)
+        headers["Accept-Language"] = self.accept_language()
+        if stored:
+            if stored.get("etag"):
+                headers["If-None-Match"] = stored["etag"]
+            if stored.get("last_modified"):
+                headers["If-Modified-Since"] = stored["last_modified"]
 
         self.logger.info(f"Fetching URL: {safe_url}")
 
         try:
-            req = Request(safe_url, headers=self.HEADERS)
-            response = urlopen(req, timeout=15)
+            response = get_session().request(
+                safe_url, headers=headers, timeout=15, policy=self.policy)
+
+            if response.status == 304 and stored:
+                response.close()
+                self.logger.info("Not modified, reusing cache: " + safe_url)
+                self.disk_cache.touch(key)
+                self.cache.set(key, stored["body"], ttl=ttl)
+                return stored["body"]
+
+            if response.status >= 400:
+                response.close()
+                self.logger.error(
+                    f"Fetch error: HTTP {response.status} {response.reason}")
+                return None
 
-            if response is None:
-                self.logger.error("No response received for URL: " + safe_url)
-                return ""
+            # Decode while reading so on_chunk can parse the page before
+            # it has fully arrived
+            pieces = []
+            for text in self._iter_text(response):
+                pieces.append(text)
+                if on_chunk:
+                    on_chunk(text)
 
-            content = response.read()
-            if not content:
+            decoded_content = "".join(pieces)
+            if not decoded_content:
                 self.logger.error("Empty response body for URL: " + safe_url)
-                return ""
-
-            try:
-                decoded_content = content.decode("utf-8", errors="replace")
-            except Exception as e:
-                self.logger.error(f"Exception Unexpected error: {str(e)}")
-                try:
-                    decoded_content = content.decode("latin-1")
-                except BaseException:
-                    decoded_content = content.decode("utf-8", errors="ignore")
+                return None
+            if response.wire_bytes != response.decoded_bytes:
+                self.logger.info(
+                    f"Received {response.wire_bytes} compressed bytes "
+                    f"for {response.decoded_bytes} bytes of page: {safe_url}")
 
             if use_cache:
-                self.cache[safe_url] = decoded_content
+                self.cache.set(key, decoded_content, ttl=ttl)
+                self.disk_cache.set(
+                    key,
+                    decoded_content,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"))
                 self.logger.info("Cached content for URL: " + safe_url)
 
             return decoded_content
 
-        except (HTTPError, URLError) as e:
+        except (OSError, ValueError) as e:
             self.logger.error(f"Fetch error: {str(e)}")
         except Exception as e:
             self.logger.error(f"Unexpected error: {str(e)}")
 
-        return ""
+        return None
+
+    def _iter_text(self, response):
+        """Yield the body of response decoded piece by piece."""
+        decoder = getincrementaldecoder("utf-8")(errors="replace")
+        for chunk in response.iter_content(self.CHUNK_SIZE):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+
+    def scan_page(self, url, scanner):
+        """
+        Download url feeding it to scanner (see parsers.MarkerScanner)
+        and stop as soon as scanner.feed() finds something, dropping the
+        connection instead of reading the rest. Returns what feed() or,
+        at the end of the page, scanner.close() returned; None on error.
+        The page is not cached.
+        """
+        headers = dict(self.HEADERS)
+        headers["Accept-Language"] = self.accept_language()
+        self.logger.info("Scanning URL: " + url)
+        try:
+            response = get_session().request(
+                url, headers=headers, timeout=15, policy=self.policy)
+            if response.status >= 400:
+                response.close()
+                self.logger.error(
+                    f"Fetch error: HTTP {response.status} {response.reason}")
+                return None
+            parsing = 0.0  # time spent in the scanner
+            try:
+                for text in self._iter_text(response):
+                    started = perf_counter()
+                    found = scanner.feed(text)
+                    parsing += perf_counter() - started
+                    if found:
+                        self.logger.info(
+                            f"Stopped after {response.wire_bytes} bytes: "
+                            f"{url}")
+                        return found
+                started = perf_counter()
+                found = scanner.close()
+                parsing += perf_counter() - started
+                return found
+            finally:
+                response.close(drain=False)
+                timing_stats.record_phase(url, "parse", parsing)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Fetch error: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"Unexpected error: {str(e)}")
+        return None
+
+    def _refresh_in_background(self, safe_url, ttl, stale, on_refresh,
+                               parse=None):
+        """
+        Revalidate safe_url in a worker thread, notify if it changed.
+        parse(content) also runs in the worker: on_refresh only gets
+        its result on the main thread.
+        """
+        key = cache_key(safe_url, self.lang)
+        with _refresh_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+
+        def revalidate():
+            content = self.flights.do(
+                key, self._download, safe_url, ttl, self.disk_cache.get(key))
+            if not content or content == stale:
+                return None
+            self.logger.info("Page changed after refresh: " + safe_url)
+            return [parse(content) if parse else content]
+
+        def done(changed):
+            with _refresh_lock:
+                _refreshing.discard(key)
+            if changed:
+                on_refresh(changed[0])
+
+        def failed(failure):
+            with _refresh_lock:
+                _refreshing.discard(key)
+            self.logger.error(
+                "Background refresh failed for {}: {}".format(
+                    safe_url, failure.getErrorMessage()))
+
+        def start():
+            run_async(revalidate).addCallbacks(done, failed)
+
+        call_in_main(start)
+
+    # Non-blocking API: same results as the blocking methods, delivered
+    # through a Deferred that fires on the main thread.
+
+    def get_continents_async(self, on_update=None):
+        return run_async(self.get_continents, on_update)
+
+    def get_countries_async(self, category_url=None, on_update=None):
+        return run_async(self.get_countries, category_url, on_update)
+
+    def get_categories_async(self, on_update=None):
+        return run_async(self.get_categories, on_update)
+
+    def get_top_webcams_async(self, on_progress=None):
+        return run_async(self.get_top_webcams, on_progress)
+
+    def prewarm_async(self):
+        return run_async(self.prewarm)
+
+    def get_locations_async(self, country_url=None, on_update=None,
+                            on_progress=None):
+        return run_async(
+            self.get_locations, country_url, on_update, on_progress)
+
+    def get_webcams_async(self, page_url=None, on_progress=None):
+        return run_async(self.get_webcams, page_url, on_progress)
+
+    def get_stream_url_async(self, webcam_page_url):
+        return run_async(self.get_stream_url, webcam_page_url)
+
+    def _fetch_parsed(self, url, parser, on_update=None, ttl=None,
+                      make_extractor=None, on_progress=None, name=None):
+        """
+        Fetch url and return parser(html). With on_update, the page is
+        served stale-while-revalidate and on_update(result) is called
+        only if the refreshed page parses to a different result.
+
+        With make_extractor and on_progress, the page is parsed while it
+        downloads instead (see fetch_progressive).
+
+        With a parser name, results are kept in the parsed cache (per
+        URL, language and PARSER_VERSION) and the HTML is dropped from
+        the page cache once parsed: a fresh result skips download and
+        parsing, a stale one is returned at once when on_update is
+        given. The disk cache still holds the page for revalidation.
+        """
+        ttl = ttl or self.PAGE_TTL
+        key = None
+        result = []
+        if name:
+            key = parsed_key(url, self.lang, name, PARSER_VERSION)
+            cached, fresh = self.parsed_cache.peek(key)
+            if fresh:
+                self.logger.info("Using parsed content for: " + url)
+                return cached
+            if cached is not None and on_update:
+                self.logger.info("Serving stale parsed content for: " + url)
+                result = cached
+
+        def parsed(new_result):
+            if key and new_result:
+                self.parsed_cache.set(key, new_result, ttl=ttl)
+                self.cache.delete(cache_key(url, self.lang))
+            return new_result
+
+        def reparse(html):
+            # Worker thread: only the result goes to the main thread
+            return parsed(self._timed_parse(url, parser, html))
+
+        def refreshed(new_result):
+            if new_result and new_result != result:
+                on_update(new_result)
+
+        if result:
+            self._refresh_in_background(url, ttl, None, refreshed, reparse)
+            return result
+
+        on_refresh = refreshed if on_update else None
+        if make_extractor and on_progress:
+            result = self.fetch_progressive(
+                url, make_extractor, on_progress, ttl, on_refresh, reparse)
+        else:
+            html = self.fetch(
+                url, ttl=ttl, on_refresh=on_refresh, parse=reparse)
+            result = self._timed_parse(url, parser, html)
+        return parsed(result)
+
+    @staticmethod
+    def _timed_parse(url, parser, html):
+        """parser(html), its duration recorded as the "parse" timing."""
+        started = perf_counter()
+        try:
+            return parser(html)
+        finally:
+            timing_stats.record_phase(url, "parse", perf_counter() - started)
+
+    def fetch_progressive(self, url, make_extractor, on_progress=None,
+                          ttl=None, on_refresh=None, parse=None):
+        """
+        Fetch url feeding the page to an extractor (built by
+        make_extractor, e.g. parsers.WebcamExtractor) while it downloads. on_progress(records) is called
+        on the main thread with all records found so far each time new
+        ones appear; the complete list is returned. on_refresh and parse
+        are passed on to fetch().
+        """
+        extractor = make_extractor()
+        records = []
+        streamed = [0]
+        parsing = [0.0]  # time spent in the extractor while downloading
+
+        def on_chunk(text):
+            streamed[0] += len(text)
+            started = perf_counter()
+            found = extractor.feed(text)
+            parsing[0] += perf_counter() - started
+            if found:
+                records.extend(found)
+                if on_progress:
+                    call_in_main(on_progress, list(records))
+
+        html = self.fetch(
+            url, ttl=ttl, on_refresh=on_refresh, on_chunk=on_chunk,
+            parse=parse)
+        started = perf_counter()
+        if streamed[0] != len(html):
+            # Served from a cache, by another caller's download or as a
+            # stale copy after an error: parse the page as a whole
+            extractor = make_extractor()
+            records = extractor.feed(html)
+            parsing[0] = 0.0
+        records.extend(extractor.close())
+        timing_stats.record_phase(
+            url, "parse", parsing[0] + perf_counter() - started)
+        return records
 
     @staticmethod
     def parse_countries(html, language="en"):
@@ -269,10 +645,9 @@ class SkylineScraper:
         Extract country links and names from the main page.
         """
         Logger().info("Entering parse_countries")  # static method: use fresh Logger
-        pattern = r'<a href="(/' + escape(language) + \
-            r'/webcam/[^"]+\.html)">([^<]+)</a>'
         try:
-            result = findall(pattern, html, IGNORECASE)
+            result = [(c["url"], c["name"])
+                      for c in parse_homepage(html, language).countries]
             Logger().info("Found {} countries".format(len(result)))
             return result
         except Exception as e:
@@ -285,10 +660,9 @@ class SkylineScraper:
         Extract main categories from homepage HTML.
         """
         Logger().info("Entering parse_categories")
-        pattern = r'<a href="(/' + escape(language) + \
-            r'/[^"]+)"[^>]*>\s*<p class="tcam">([^<]+)</p>'
         try:
-            result = findall(pattern, html)
+            result = [(c["url"], c["name"])
+                      for c in parse_homepage(html, language).categories]
             Logger().info("Found {} categories".format(len(result)))
             return result
         except Exception as e:
@@ -302,38 +676,81 @@ class SkylineScraper:
             base_url=None,
             fetch_func=None,
             parse_func=None,
-            logger=None):
+            logger=None,
+            on_page=None):
         """
         Parse top webcams with pagination support (static)
+
+        The other pages are fetched with fetch_func concurrently, pages
+        linked from them included. Webcams are merged in page order
+        without duplicate URLs; on_page(webcams) receives the merged
+        list each time the next page in order is done. Call from a
+        worker thread.
         """
         if logger:
             logger.info("Entering parse_top_webcams")
 
-        webcams = []
-        if parse_func:
-            webcams = parse_func(html, escape(language), base_url)
-
         pagination_pattern = r'<a href="(/' + \
             escape(language) + r'/top-webcams-(\d+)\.html)"'
-        pagination_matches = findall(pagination_pattern, html, IGNORECASE)
 
-        for url, page_num in pagination_matches:
+        def page_links(content):
+            return dict((int(num), url) for url, num in
+                        findall(pagination_pattern, content, IGNORECASE))
+
+        def load_page(page):
+            num, url = page
             full_url = base_url + url
             if logger:
-                logger.info(
-                    f"Processing top webcams page {page_num}: {full_url}")
-            if fetch_func:
-                page_content = fetch_func(full_url)
-                if page_content and parse_func:
-                    webcams.extend(
-                        parse_func(
-                            page_content,
-                            language,
-                            base_url))
+                logger.info(f"Processing top webcams page {num}: {full_url}")
+            content = fetch_func(full_url) if fetch_func else None
+            return content or ""
+
+        # The first page is page 0; parsed pages wait in pages until
+        # every page before them is merged
+        pages = {0: parse_func(html, escape(language), base_url)
+                 if parse_func else []}
+        links = page_links(html)
+        queued = set(links)
+        merged_pages = set()
+        merged = []
+        seen = set()
+
+        def merge():
+            grown = False
+            for num in sorted(queued.union(pages)):
+                if num in merged_pages:
+                    continue
+                if num not in pages:
+                    break
+                merged_pages.add(num)
+                for webcam in pages[num]:
+                    if webcam["url"] not in seen:
+                        seen.add(webcam["url"])
+                        merged.append(webcam)
+                        grown = True
+            if grown and on_page:
+                on_page(list(merged))
+
+        merge()
+        while links:
+            found = {}
+            for (num, _), content, error in run_parallel(
+                    load_page, sorted(links.items()),
+                    "WorldCamPages", TOP_PAGE_WORKERS):
+                if error is not None and logger:
+                    logger.error(f"Top webcams page {num} failed: {error}")
+                content = content or ""
+                pages[num] = (parse_func(content, language, base_url)
+                              if content and parse_func else [])
+                found.update(page_links(content))
+                merge()
+            links = dict((num, url) for num, url in found.items()
+                         if num not in queued and num not in pages)
+            queued.update(links)
 
         if logger:
-            logger.info(f"Total top webcams found: {len(webcams)}")
-        return webcams
+            logger.info(f"Total top webcams found: {len(merged)}")
+        return merged
 
     @staticmethod
     def parse_webcams(
@@ -341,47 +758,8 @@ class SkylineScraper:
             language="en",
             base_url="https://www.skylinewebcams.com"):
         Logger().info("Entering parse_webcams")
-        webcams = []
-        # Improved pattern to capture all webcam entries
-        pattern = (
-            r'<a\s+href="([^"]+)"\s+class="[^"]*col-xs-12[^"]*col-sm-6[^"]*col-md-4[^"]*"[^>]*>'
-            r'.*?<img\s+src="([^"]+)"[^>]*alt="([^"]*)"[^>]*>'
-            r'.*?<p\s+class="tcam">(.*?)</p>'
-            r'.*?<p\s+class="subt">(.*?)</p>')
-
-        matches = findall(pattern, html, DOTALL)
-        Logger().info(f"Found {len(matches)} webcam matches")
-
-        for match in matches:
-            href = match[0]
-            thumbnail = match[1]
-            alt = match[2]
-            name = match[3].strip()
-            description = match[4].strip()
-
-            # Skip ads and invalid entries
-            if "Advertisement" in name or not href:
-                continue
-
-            # Build full URL
-            if href.startswith('http'):
-                full_url = href
-            else:
-                full_url = base_url + \
-                    (href if href.startswith('/') else '/' + href)
-
-            webcams.append({
-                "url": full_url,
-                "thumbnail": thumbnail,
-                "alt": alt,
-                "name": name,
-                "description": description
-            })
-
-        # Fallback for different formats
-        if not webcams:
-            Logger().info("Using fallback parsing method")
-
+        # Linear-time tile scanner; skips ads and incomplete tiles
+        webcams = parse_grid(html, base_url)
         Logger().info(f"Returning {len(webcams)} valid webcams")
         return webcams
 
@@ -391,12 +769,7 @@ class SkylineScraper:
         locations = []
 
         # Primary pattern for location buttons
-        location_pattern = r'<a href="([^"]+)" class="[^"]*\bbtn\b[^"]*\bbtn-primary\b[^"]*"[^>]*>([^<]+)</a>'
-
-        # Webcam grid fallback pattern
-        webcam_pattern = (
-            r'<a href="([^"]+)" class="[^"]*col-xs-12[^"]*col-sm-6[^"]*col-md-4[^"]*"[^>]*>'
-            r'.*?<div class="cam-light">')
+        location_pattern = LOCATION_PATTERN
 
         try:
             # Extract locations from buttons
@@ -407,14 +780,12 @@ class SkylineScraper:
 
             # If no buttons found, fallback to extracting from webcam grid
             if not locations:
-                webcam_matches = findall(webcam_pattern, html, DOTALL)
-                for href in webcam_matches:
+                for href, body, end in scan_grid(html):
+                    if html.find('<div class="cam-light">', body, end) < 0:
+                        continue
                     # Extract location name from URL
-                    parts = href.split('/')
-                    if len(parts) >= 5:
-                        name = parts[4].replace(
-                            '.html', '').replace(
-                            '-', ' ').title()
+                    name = location_name_from_url(href)
+                    if name:
                         locations.append((href, name))
                         Logger().info(f"Fallback location: {name} -> {href}")
 
@@ -605,42 +976,49 @@ class SkylineScraper:
             logger.info(f"Parsed {len(channels)} channels from playlist")
         return channels
 
-    def get_continents(self):
+    def get_homepage(self, on_update=None):
         """
-        Get continents from the main page.
+        The homepage in the scraper language as a parsers.HomepageModel.
+        It is parsed once per page version and kept in the parsed cache,
+        shared by get_continents, get_countries and get_categories, so
+        the three lists always come from the same page.
         """
-        self.logger.info("Entering get_continents")
         url = self.BASE_URL + "/" + self.lang
-        html = self.fetch(url)
-        continents = []
-
-        continent_pattern = r'<div class="continent\s+(\w+)"><strong>([^<]+)</strong></div>(.*?)</div>\s*</div>'
-        country_pattern = r'<a href="(/' + self.lang + \
-            r'/webcam/[^"]+\.html)">([^<]+)</a>'
+        return self._fetch_parsed(
+            url, self._homepage_model, on_update, ttl=self.HOME_TTL,
+            name="homepage")
 
+    def _homepage_model(self, html):
         try:
-            matches = findall(continent_pattern, html, DOTALL | IGNORECASE)
-            for match in matches:
-                continent_class = match[0]
-                continent_name = match[1]
-                continent_html = match[2]
-
-                countries = []
-                country_matches = findall(
-                    country_pattern, continent_html, IGNORECASE)
-                for path, name in country_matches:
-                    full_url = self.BASE_URL + path
-                    countries.append({"name": name, "url": full_url})
-
-                continents.append({
-                    "name": continent_name,
-                    "class": continent_class,
-                    "countries": sorted(countries, key=lambda c: c["name"].lower())
-                })
-            return continents
+            model = parse_homepage(html, self.lang, self.BASE_URL)
         except Exception as e:
-            self.logger.error("Error in get_continents: " + str(e))
-            return []
+            self.logger.error("Error parsing homepage: " + str(e))
+            return HomepageModel()
+        self.logger.info(
+            "Homepage: {} continents, {} countries, {} categories".format(
+                len(model.continents), len(model.countries),
+                len(model.categories)))
+        return model
+
+    def _homepage_part(self, part, on_update=None):
+        """One list of the HomepageModel; on_update gets that list only
+        when a refresh changed it."""
+        result = []
+
+        def refreshed(model):
+            if getattr(model, part) != result:
+                on_update(getattr(model, part))
+
+        result = getattr(
+            self.get_homepage(refreshed if on_update else None), part)
+        return result
+
+    def get_continents(self, on_update=None):
+        """
+        Get continents from the main page.
+        """
+        self.logger.info("Entering get_continents")
+        return self._homepage_part("continents", on_update)
 
     def get_countries_by_continent(self, continent_url=None):
         """
@@ -663,81 +1041,108 @@ class SkylineScraper:
             Logger().info("Error in get_countries_by_continent: " + str(e))
             return []
 
-    def get_countries(self, category_url=None):
+    def get_countries(self, category_url=None, on_update=None):
         """
         Get countries from a category page or homepage.
         """
         self.logger.info("Entering get_countries")
-        url = category_url or self.BASE_URL
-        html = self.fetch(url)
-        countries = []
-        try:
-            for path, name in self.parse_countries(html, self.lang):
-                full_url = self.BASE_URL + path
-                self.logger.info(
-                    "Country found: {} -> {}".format(name, full_url))
-                countries.append({"name": name, "url": full_url})
-        except Exception as e:
-            self.logger.error("Error in get_countries: " + str(e))
-        return countries
-
-    def get_categories(self):
+        if not category_url:
+            return self._homepage_part("countries", on_update)
+        return self._fetch_parsed(
+            category_url,
+            lambda html: parse_homepage(
+                html, self.lang, self.BASE_URL).countries,
+            on_update, name="countries")
+
+    def get_categories(self, on_update=None):
         """
         Get main categories from homepage.
         """
         self.logger.info("Entering get_categories")
-        html = self.fetch(self.BASE_URL + "/" + self.lang)
+        return self._homepage_part("categories", on_update)
 
-        categories = []
-        try:
-            for path, name in self.parse_categories(html, self.lang):
-                full_url = self.BASE_URL + path
-                self.logger.info(
-                    "Category found: {} -> {}".format(name, full_url))
-                categories.append({"name": name, "url": full_url})
-        except Exception as e:
-            self.logger.error("Error in get_categories: " + str(e))
-        return categories
-
-    def get_top_webcams(self):
-        """Get featured webcams from the homepage."""
+    def get_top_webcams(self, on_progress=None):
+        """
+        Get featured webcams from the top webcams pages.
+        With on_progress, the first page is reported as soon as it is
+        parsed and the list again each time a further page is merged.
+        """
         self.logger.info("Entering get_top_webcams")
         url = self.BASE_URL + "/" + self.lang + "/top-live-cams.html"
-        html = self.fetch(url)
+        key = parsed_key(url, self.lang, "top_webcams", PARSER_VERSION)
+        cached = self.parsed_cache.get(key)
+        if cached:
+            self.logger.info("Using parsed top webcams")
+            return cached
+
+        def fetch_page(page_url):
+            # Parsed right away: the HTML need not stay in the page cache
+            content = self.fetch(page_url)
+            self.cache.delete(cache_key(page_url, self.lang))
+            return content
+
+        html = fetch_page(url)
 
         if not html:
             self.logger.error("Failed to fetch top webcams page")
             return []
 
+        def valid(webcams):
+            return [w for w in webcams if w.get("name") and w.get(
+                "url") and "Advertisement" not in w["name"]]
+
+        def on_page(webcams):
+            if on_progress:
+                call_in_main(on_progress, valid(webcams))
+
         try:
-            # Use the same parsing method as regular webcams
-            webcams = self.parse_webcams(html, self.lang, self.BASE_URL)
-            """
-            # webcams = self.parse_top_webcams(
-                # html,
-                # language=self.lang,
-                # base_url=self.BASE_URL,
-                # fetch_func=self.fetch,
-                # parse_func=self.parse_webcams,
-                # logger=self.logger
-            # )
-            """
+            # Every page is parsed like a regular webcams page
+            webcams = self.parse_top_webcams(
+                html,
+                language=self.lang,
+                base_url=self.BASE_URL,
+                fetch_func=fetch_page,
+                parse_func=self.parse_webcams,
+                logger=self.logger,
+                on_page=on_page
+            )
             # Filter out any invalid entries
-            valid_webcams = [w for w in webcams if w.get("name") and w.get(
-                "url") and "Advertisement" not in w["name"]]
+            valid_webcams = valid(webcams)
 
             self.logger.info(f"Found {len(valid_webcams)} valid top webcams")
+            if valid_webcams:
+                self.parsed_cache.set(key, valid_webcams, ttl=self.PAGE_TTL)
             return valid_webcams
         except Exception as e:
             self.logger.error("Error in get_top_webcams: " + str(e))
             return []
 
-    def get_locations(self, country_url=None):
+    def prewarm(self):
+        """
+        Load the pages a user usually opens first into the caches for
+        the scraper language: the homepage (continents, countries,
+        categories) and the country viewed last, in this language.
+        """
+        self.logger.info("Pre-warming caches for language: " + self.lang)
+        self.get_continents()
+        self.get_categories()
+        if _last_country_url:
+            self.get_locations(self.localize_url(_last_country_url))
+        self.logger.info("Caches ready for language: " + self.lang)
+
+    def get_locations(self, country_url=None, on_update=None,
+                      on_progress=None):
         """
         Fetch and parse the list of locations for a given country URL.
+        With on_progress, locations are reported while the page loads.
         """
         self.logger.info(f"Processing country: {country_url}")
-        content = self.fetch(country_url)
+        return self._fetch_parsed(
+            country_url, self._parse_location_list, on_update,
+            make_extractor=lambda: LocationExtractor(self.get_full_url),
+            on_progress=on_progress, name="locations")
+
+    def _parse_location_list(self, content):
         self.logger.info(f"Country page length: {len(content)}")
 
         locations = []
@@ -779,15 +1184,18 @@ class SkylineScraper:
             self.logger.error(f"Error reading playlists directory: {str(e)}")
             return user_lists
 
-    def get_webcams(self, page_url=None):
+    def get_webcams(self, page_url=None, on_progress=None):
         """
         Ottiene le webcam per una pagina usando il nuovo parser robusto
+
+        With on_progress, webcams are reported while the page loads.
         """
         self.logger.info(f"Processing page: {page_url}")
-        html = self.fetch(page_url)
-
-        if not html:
-            self.logger.error("Failed to fetch page content")
-            return []
-
-        return self.parse_webcams(html, self.lang, self.BASE_URL)
+        webcams = self._fetch_parsed(
+            page_url,
+            lambda page: self.parse_webcams(page, self.lang, self.BASE_URL),
+            make_extractor=lambda: WebcamExtractor(self.BASE_URL),
+            on_progress=on_progress, name="webcams")
+        if not webcams:
+            self.logger.error("No webcams found on page: " + str(page_url))
+        return webcams
@@ -0,0 +1,193 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left
+from heapq import nsmallest
+from re import UNICODE, compile
+from unicodedata import category, normalize
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Search Index for Plugin                     #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+SEARCH_MAX_RESULTS = 200
+
+# Prefixes up to this length get their own postings, so very short
+# queries (typed first) do not have to merge hundreds of tokens
+PREFIX_INDEX_LEN = 3
+
+# Relevance of a match per field
+FIELD_WEIGHTS = {
+    "name": 4,
+    "location": 3,
+    "country": 2,
+    "description": 1,
+}
+
+_TOKEN_RE = compile(r"\w+", UNICODE)
+
+
+def fold(text):
+    """Lowercase and strip accents: 'Città' -> 'citta'."""
+    text = normalize("NFKD", text or "")
+    return "".join(c for c in text if category(c) != "Mn").lower()
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(fold(text))
+
+
+class SearchIndex:
+    """
+    Inverted index over webcams: token -> {doc id: weight}, plus
+    postings for short prefixes and a sorted vocabulary for longer
+    ones. Every query term matches as a prefix, so results update
+    while the user types.
+    """
+
+    def __init__(self):
+        self.docs = []
+        self.postings = {}
+        self.prefixes = {}
+        self.vocabulary = []
+        self.revision = None
+        self._urls = set()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, webcam, location="", country=""):
+        """Index one webcam dict (as returned by parse_webcams)."""
+        url = webcam.get("url")
+        if not url or url in self._urls:
+            return
+        self._urls.add(url)
+        doc_id = len(self.docs)
+        doc = dict(webcam)
+        doc["location"] = location
+        doc["country"] = country
+        self.docs.append(doc)
+
+        fields = {
+            "name": webcam.get("name"),
+            "location": location,
+            "country": country,
+            "description": webcam.get("description"),
+        }
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                self._post(self.postings, token, doc_id, weight)
+                for size in range(1, min(len(token), PREFIX_INDEX_LEN) + 1):
+                    self._post(self.prefixes, token[:size], doc_id, weight)
+
+    @staticmethod
+    def _post(table, key, doc_id, weight):
+        docs = table.get(key)
+        if docs is None:
+            table[key] = {doc_id: weight}
+        elif docs.get(doc_id, 0) < weight:
+            docs[doc_id] = weight
+
+    def build(self, catalog):
+        """
+        Rebuild from a Catalog. Webcams listed on a location page get
+        that location and its country; category pages are added last.
+        """
+        self.__init__()
+        # The crawler updates the catalog meanwhile: work on a copy
+        with catalog._lock:
+            revision = catalog.revision
+            countries = list(catalog.countries)
+            for continent in catalog.continents:
+                countries.extend(continent.get("countries", []))
+            locations = dict(catalog.locations)
+            pages = list(catalog.webcams.items())
+
+        places = {}
+        for country in countries:
+            for location in locations.get(country["url"]) or []:
+                places[location["url"]] = (location["name"], country["name"])
+
+        pages.sort(key=lambda item: item[0] not in places)
+        for page_url, webcams in pages:
+            location, country = places.get(page_url, ("", ""))
+            for webcam in webcams:
+                self.add(webcam, location, country)
+        self.finish()
+        self.revision = revision
+        return self
+
+    def finish(self):
+        """Prepare the vocabulary for prefix lookups after adding."""
+        self.vocabulary = sorted(self.postings)
+
+    def _matches(self, term):
+        """doc id -> score for one query term (exact match ranks higher)."""
+        if len(term) <= PREFIX_INDEX_LEN:
+            matches = dict(self.prefixes.get(term, {}))
+        else:
+            matches = {}
+            vocabulary = self.vocabulary
+            i = bisect_left(vocabulary, term)
+            while i < len(vocabulary) and vocabulary[i].startswith(term):
+                for doc_id, weight in self.postings[vocabulary[i]].items():
+                    if matches.get(doc_id, 0) < weight:
+                        matches[doc_id] = weight
+                i += 1
+        for doc_id, weight in self.postings.get(term, {}).items():
+            matches[doc_id] = max(matches.get(doc_id, 0), weight) + weight
+        return matches
+
+    def search(self, query, limit=SEARCH_MAX_RESULTS):
+        """Return webcams matching every term of query, best first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            matches = self._matches(term)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {doc_id: score + matches[doc_id]
+                          for doc_id, score in scores.items()
+                          if doc_id in matches}
+            if not scores:
+                return []
+
+        docs = self.docs
+        ranked = nsmallest(
+            limit, scores,
+            key=lambda doc_id: (-scores[doc_id], docs[doc_id]["name"].lower()))
+        return [docs[doc_id] for doc_id in ranked]
+
+
+_indexes = {}
+
+
+def get_index(catalog):
+    """
+    Return the search index for a catalog, rebuilding it when the
+    catalog changed. Building can take a while: call from a worker.
+    """
+    index = _indexes.get(catalog.lang)
+    if index is None or index.revision != catalog.revision:
+        index = _indexes[catalog.lang] = SearchIndex().build(catalog)
+    return index
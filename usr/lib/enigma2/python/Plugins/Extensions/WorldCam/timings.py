@@ -0,0 +1,229 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from json import dump
+from os import makedirs, rename
+from os.path import exists, join
+from threading import Lock, local
+from time import perf_counter, time
+from urllib.parse import urlsplit
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Network Timings for Plugin                  #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+TIMINGS_DIR = "/tmp/worldcam"
+TIMINGS_FILE = "timings.json"
+
+# The histograms are written out at most this often (seconds)
+TIMINGS_DUMP_INTERVAL = 60
+
+# Upper bounds of the histogram buckets (milliseconds); slower samples
+# go to the last, open-ended bucket
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+              10000, 30000)
+
+# Request phases, in order; "parse" is our own work after the download
+PHASES = ("dns", "connect", "tls", "ttfb", "transfer", "parse")
+
+_current = local()
+
+
+class Histogram:
+    """Counts of samples per BUCKETS_MS bucket, plus sum/min/max."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, ms):
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        if self.min is None or ms < self.min:
+            self.min = ms
+        if self.max is None or ms > self.max:
+            self.max = ms
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile."""
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else None,
+            "min_ms": round(self.min, 2) if self.min is not None else None,
+            "max_ms": round(self.max, 2) if self.max is not None else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "buckets_ms": dict(
+                ("<=%d" % bound, n)
+                for bound, n in zip(BUCKETS_MS, self.counts) if n),
+            "slower": self.counts[-1],
+        }
+
+
+class RequestTiming:
+    """Phase durations (seconds) of one HTTP request to one host."""
+
+    def __init__(self, url):
+        self.host = urlsplit(url).hostname or ""
+        self.phases = {}
+        self.started = perf_counter()
+        self.status = None
+        self.reused = False
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def connecting(self):
+        """Time spent in DNS, connect and TLS so far."""
+        return sum(self.phases.get(phase, 0.0)
+                   for phase in ("dns", "connect", "tls"))
+
+
+def begin(url):
+    """Start timing a request made on this thread."""
+    timing = _current.timing = RequestTiming(url)
+    return timing
+
+
+def current():
+    """The request being timed on this thread, or None."""
+    return getattr(_current, "timing", None)
+
+
+def end():
+    timing = current()
+    _current.timing = None
+    return timing
+
+
+def add_phase(phase, seconds):
+    """Add to a phase of the request timed on this thread, if any."""
+    timing = current()
+    if timing is not None:
+        timing.add(phase, seconds)
+
+
+class TimingStats:
+    """Per-host histograms of every request phase."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._last_dump = time()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hosts = {}
+
+    def _host(self, host):
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = self.hosts[host] = {
+                "requests": 0,
+                "reused_connections": 0,
+                "errors": 0,
+                "wire_bytes": 0,
+                "decoded_bytes": 0,
+                "status": {},
+                "phases": dict((phase, Histogram()) for phase in PHASES),
+            }
+        return stats
+
+    def record(self, timing):
+        """Add a finished RequestTiming."""
+        with self._lock:
+            stats = self._host(timing.host)
+            stats["requests"] += 1
+            if timing.reused:
+                stats["reused_connections"] += 1
+            if timing.status is None:
+                stats["errors"] += 1
+            else:
+                status = str(timing.status)
+                stats["status"][status] = stats["status"].get(status, 0) + 1
+            stats["wire_bytes"] += timing.wire_bytes
+            stats["decoded_bytes"] += timing.decoded_bytes
+            for phase, seconds in timing.phases.items():
+                stats["phases"][phase].add(seconds * 1000.0)
+        self._maybe_dump()
+
+    def record_phase(self, url, phase, seconds):
+        """Add a single phase sample, e.g. the parse time of a page."""
+        with self._lock:
+            host = urlsplit(url).hostname or ""
+            self._host(host)["phases"][phase].add(seconds * 1000.0)
+
+    def snapshot(self):
+        with self._lock:
+            hosts = {}
+            for host, stats in self.hosts.items():
+                entry = dict(stats)
+                entry["status"] = dict(stats["status"])
+                entry["phases"] = dict(
+                    (phase, histogram.to_dict())
+                    for phase, histogram in stats["phases"].items()
+                    if histogram.count)
+                hosts[host] = entry
+            return {"generated": time(), "hosts": hosts}
+
+    def dump(self, path=None):
+        """Write the histograms as JSON; returns the file path or None."""
+        path = path or join(TIMINGS_DIR, TIMINGS_FILE)
+        tmp_path = path + ".tmp"
+        try:
+            directory = path.rsplit("/", 1)[0]
+            if directory and not exists(directory):
+                makedirs(directory)
+            with open(tmp_path, "w") as f:
+                dump(self.snapshot(), f, indent=1, sort_keys=True)
+            rename(tmp_path, path)
+            return path
+        except (OSError, ValueError):
+            return None
+
+    def _maybe_dump(self):
+        now = time()
+        with self._lock:
+            if now - self._last_dump < TIMINGS_DUMP_INTERVAL:
+                return
+            self._last_dump = now
+        self.dump()
+
+
+timing_stats = TimingStats()
@@ -11,13 +11,12 @@ from json import JSONDecodeError, loads
 from os import makedirs, remove
 from os.path import dirname, exists, join
 
-from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
 from Components.config import config
 
 from . import DEBUG, HEADERS, SYSTEM_DIR
+from .network import get_session
 
 # ============================================================
 # CUSTOM CONFIGURATION
@@ -321,14 +320,15 @@ def translate_text(text, target_lang=None, use_cache=True):
 
         _log(f"Translating: '{text_unicode[:40]}...' -> {target_lang}")
 
-        # Set timeout to avoid blocking
-        socket.setdefaulttimeout(REQUEST_TIMEOUT)
-
-        # Perform the request
-        req = Request(url)
-        for key, value in HEADERS.items():
-            req.add_header(key, value)
-        response = urlopen(req, timeout=REQUEST_TIMEOUT)
+        # Perform the request on the shared keep-alive session, rate
+        # limited and retried by the "translate" policy
+        response = get_session().request(
+            url, headers=HEADERS, timeout=REQUEST_TIMEOUT,
+            policy="translate")
+        if response.status >= 400:
+            response.close()
+            _log(f"HTTP error {response.status}: {response.reason}")
+            return text_unicode
         raw_data = response.read()
 
         # Decode the response
@@ -369,8 +369,8 @@ def translate_text(text, target_lang=None, use_cache=True):
         _log(f"TIMEOUT during translation: '{text_unicode[:30]}...'")
         return text_unicode
 
-    except (URLError, HTTPError) as e:
-        _log(f"HTTP error {getattr(e, 'code', 'N/A')}: {str(e)}")
+    except OSError as e:
+        _log(f"HTTP error N/A: {str(e)}")
         return text_unicode
 
     except JSONDecodeError as e:
@@ -382,10 +382,6 @@ def translate_text(text, target_lang=None, use_cache=True):
         _log(f"Error {error_type}: {str(e)}")
         return text_unicode
 
-    finally:
-        # Restore default timeout
-        socket.setdefaulttimeout(None)
-
 
 # ============================================================
 # AUXILIARY FUNCTIONS FOR SPECIAL CASES
@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from queue import Queue
+from threading import Event, Lock
+
+from twisted.internet import reactor
+from twisted.internet.threads import deferToThreadPool
+from twisted.python.threadable import isInIOThread
+from twisted.python.threadpool import ThreadPool
+
+"""
+#########################################################
+#                                                       #
+#  Worldcam Background Workers for Plugin               #
+#  Version: 1.0                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept Lululla                           #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+__author__ = "Lululla"
+
+# Maximum number of concurrent blocking jobs (network + parsing)
+WORKER_POOL_SIZE = 3
+WORKER_POOL_NAME = "WorldCam"
+
+_pools = {}
+_pools_lock = Lock()
+
+
+def get_pool(name=WORKER_POOL_NAME, size=WORKER_POOL_SIZE):
+    """
+    Return the named worker pool, starting it on first use. Background
+    jobs use their own pool so they never hold up the screens.
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ThreadPool(
+                minthreads=0,
+                maxthreads=size,
+                name=name)
+            pool.start()
+            call_in_main(
+                reactor.addSystemEventTrigger, "during", "shutdown", pool.stop)
+        return pool
+
+
+def run_async(func, *args, **kwargs):
+    """
+    Run a blocking func(*args, **kwargs) in the worker pool.
+    Returns a Deferred whose callbacks fire on the main (reactor) thread.
+    """
+    return deferToThreadPool(reactor, get_pool(), func, *args, **kwargs)
+
+
+def call_in_main(func, *args, **kwargs):
+    """Call func on the main thread, directly if we are already there."""
+    if isInIOThread():
+        return func(*args, **kwargs)
+    reactor.callFromThread(func, *args, **kwargs)
+
+
+def run_parallel(func, items, name, size):
+    """
+    Run func(item) for every item on the named pool and yield
+    (item, result, error) as each call ends. Blocks: meant for a worker
+    thread of another pool.
+    """
+    items = list(items)
+    done = Queue()
+    pool = get_pool(name, size)
+    for item in items:
+        pool.callInThreadWithCallback(
+            lambda ok, result, item=item: done.put((item, ok, result)),
+            func, item)
+    for _i in range(len(items)):
+        item, ok, result = done.get()
+        if ok:
+            yield item, result, None
+        else:
+            yield item, None, result.value
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key: the first caller runs
+    the function, the others wait for it and share its result (or its
+    exception). Meant for worker threads; never call it on the main
+    thread while a worker may hold the same key.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}  # key -> [event, result, error]
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = [Event(), None, None]
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1]
+
+        try:
+            call[1] = func(*args, **kwargs)
+        except Exception as e:
+            call[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call[0].set()
+        return call[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+            }